@@ -0,0 +1,37 @@
+"""
+Awaitable facade over DatabaseStorage for use from async request handlers.
+
+Each storage call runs in a worker thread so database round-trips do not
+block the event loop while other requests are in flight.
+"""
+
+import asyncio
+from functools import wraps
+from typing import Optional
+
+from .storage_service import DatabaseStorage
+
+
+class AsyncDatabaseStorage:
+    """Expose every DatabaseStorage method as a coroutine."""
+
+    def __init__(self, storage: Optional[DatabaseStorage] = None):
+        self._storage = storage or DatabaseStorage()
+
+    @property
+    def sync(self) -> DatabaseStorage:
+        """Underlying synchronous storage, for code that already runs off the loop."""
+        return self._storage
+
+    def __getattr__(self, name):
+        attr = getattr(self._storage, name)
+        if not callable(attr):
+            return attr
+
+        @wraps(attr)
+        async def call(*args, **kwargs):
+            return await asyncio.to_thread(attr, *args, **kwargs)
+
+        # Cache the wrapper so later lookups skip __getattr__
+        setattr(self, name, call)
+        return call
@@ -0,0 +1,117 @@
+"""
+Read-through caches for the storage layer.
+
+Uses Redis when REDIS_URL is set so that all workers share one cache and
+invalidations are visible fleet-wide; otherwise falls back to a
+process-local TTL cache.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe, size-bounded LRU cache with per-entry expiry (None disables either bound)."""
+
+    def __init__(self, maxsize: Optional[int] = 1024, ttl: Optional[float] = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (None if self.ttl is None else time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while self.maxsize is not None and len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCache:
+    """JSON-serialized cache shared across workers through Redis."""
+
+    def __init__(self, client, namespace: str, ttl: Optional[float] = 60.0):
+        self._client = client
+        self._prefix = f"tradingagents:{namespace}:"
+        self.ttl = ttl
+
+    def get(self, key, default=None):
+        try:
+            raw = self._client.get(self._prefix + str(key))
+        except Exception as e:
+            logger.warning(f"Redis cache get failed for {key}: {e}")
+            return default
+        return default if raw is None else json.loads(raw)
+
+    def set(self, key, value):
+        try:
+            ex = None if self.ttl is None else max(1, int(self.ttl))
+            self._client.set(self._prefix + str(key), json.dumps(value, default=str), ex=ex)
+        except Exception as e:
+            logger.warning(f"Redis cache set failed for {key}: {e}")
+
+    def delete(self, key):
+        try:
+            self._client.delete(self._prefix + str(key))
+        except Exception as e:
+            logger.warning(f"Redis cache delete failed for {key}: {e}")
+
+    def clear(self):
+        try:
+            keys = list(self._client.scan_iter(match=self._prefix + "*"))
+            if keys:
+                self._client.delete(*keys)
+        except Exception as e:
+            logger.warning(f"Redis cache clear failed for {self._prefix}: {e}")
+
+
+_redis_client = None
+
+
+def _get_redis_client():
+    global _redis_client
+    if _redis_client is None:
+        import redis
+        _redis_client = redis.Redis.from_url(REDIS_URL)
+    return _redis_client
+
+
+def make_cache(namespace: str, maxsize: Optional[int] = 1024, ttl: Optional[float] = 60.0, shared: bool = True):
+    """Create a cache; shared caches use Redis when REDIS_URL is configured. ttl=None never expires."""
+    if shared and REDIS_URL:
+        try:
+            return RedisCache(_get_redis_client(), namespace, ttl)
+        except Exception as e:
+            logger.warning(f"Redis unavailable, using local cache for {namespace}: {e}")
+    return TTLCache(maxsize=maxsize, ttl=ttl)
@@ -7,7 +7,7 @@ import os
 from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import QueuePool, StaticPool
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,18 +15,37 @@ logger = logging.getLogger(__name__)
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./data/tradingagents.db")
 
+# Connection pool sizing (ignored for in-memory SQLite, which needs a single shared connection)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "40"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# Compiled-statement cache entries per engine (SQLAlchemy default is 500)
+DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "1200"))
+
 # Create SQLite engine with optimizations
 if DATABASE_URL.startswith("sqlite"):
     # SQLite-specific configuration
+    if ":memory:" in DATABASE_URL or DATABASE_URL.rstrip("/") == "sqlite:":
+        pool_options = {"poolclass": StaticPool}
+    else:
+        # File databases get a real pool so threads don't share one connection
+        pool_options = {
+            "poolclass": QueuePool,
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+        }
+    
     engine = create_engine(
         DATABASE_URL,
-        poolclass=StaticPool,
+        **pool_options,
         connect_args={
             "check_same_thread": False,  # Allow multiple threads
             "timeout": 30,  # Connection timeout
         },
         echo=False,  # Set to True for SQL debugging
         future=True,  # Use SQLAlchemy 2.0 style
+        query_cache_size=DB_QUERY_CACHE_SIZE,
     )
     
     # Enable WAL mode and other optimizations for SQLite
@@ -51,14 +70,22 @@ else:
         DATABASE_URL,
         echo=False,
         future=True,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
         pool_pre_ping=True,
-        pool_recycle=3600,
+        pool_recycle=DB_POOL_RECYCLE,
+        query_cache_size=DB_QUERY_CACHE_SIZE,
     )
 
 # Create sessionmaker
 SessionLocal = sessionmaker(
     autocommit=False,
+    # Reads never scan the identity map for pending changes; writes are
+    # flushed explicitly by commit() or _commit()
     autoflush=False,
+    # Sessions are short-lived and closed right after commit; skip the
+    # post-commit expiry that would reload attributes on next access
+    expire_on_commit=False,
     bind=engine,
     future=True
 )
@@ -66,13 +93,24 @@ SessionLocal = sessionmaker(
 # Create declarative base
 Base = declarative_base()
 
+# Session.info flag: storage methods flush instead of committing, the owner commits once
+SHARED_TRANSACTION = "shared_transaction"
+
 def get_db():
     """
     Dependency for FastAPI to get database session.
+    
+    The session is shared by every storage call made with `db=` during the
+    request and committed once when the request finishes (rolled back on error).
     """
     db = SessionLocal()
+    db.info[SHARED_TRANSACTION] = True
     try:
         yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
 
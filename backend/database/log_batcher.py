@@ -0,0 +1,114 @@
+"""
+Background writer that batches system log inserts.
+
+When started, log_system_event hands events to an in-process queue and a
+daemon thread writes them with a single executemany INSERT per batch,
+instead of one session and commit per event.
+"""
+
+import atexit
+import queue
+import threading
+from typing import Any, Callable, Dict, List
+import logging
+
+from .database import SessionLocal
+from .models import SystemLog
+
+logger = logging.getLogger(__name__)
+
+# Table-level INSERT: executemany without going through the ORM bulk-insert path
+SYSTEM_LOG_INSERT = SystemLog.__table__.insert()
+
+
+class SystemLogBatcher:
+    """Queue system log rows and flush them every `flush_interval` seconds or `max_batch` rows."""
+
+    def __init__(self, session_factory=SessionLocal, max_batch: int = 500, flush_interval: float = 0.1):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._flush_listeners: List[Callable[[List[Dict[str, Any]]], None]] = []
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the writer thread; safe to call more than once."""
+        with self._lock:
+            if self.running:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="system-log-batcher", daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+            logger.info("System log batching started")
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the writer thread after flushing queued events."""
+        with self._lock:
+            if not self.running:
+                return
+            self._stop.set()
+            self._thread.join(timeout)
+            self._thread = None
+        # Anything enqueued after the thread exited is written here
+        rows = self._drain()
+        while rows:
+            self._flush(rows)
+            rows = self._drain()
+        logger.info("System log batching stopped")
+
+    def add_flush_listener(self, listener: Callable[[List[Dict[str, Any]]], None]):
+        """Call `listener` with each batch of rows once it has been committed."""
+        self._flush_listeners.append(listener)
+
+    def submit(self, event_type: str, event_data: Dict[str, Any]) -> bool:
+        """Queue an event; returns False when batching is not running."""
+        if not self.running:
+            return False
+        self._queue.put({"event_type": event_type, "event_data": event_data})
+        return True
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        rows = []
+        while len(rows) < self.max_batch:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def _run(self):
+        while not self._stop.is_set() or not self._queue.empty():
+            try:
+                rows = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            rows.extend(self._drain())
+            self._flush(rows)
+
+    def _flush(self, rows: List[Dict[str, Any]]):
+        if not rows:
+            return
+        try:
+            with self.session_factory() as db:
+                db.execute(SYSTEM_LOG_INSERT, rows)
+                db.commit()
+        except Exception as e:
+            logger.error(f"Error writing {len(rows)} batched system logs: {e}")
+            return
+        for listener in self._flush_listeners:
+            try:
+                listener(rows)
+            except Exception as e:
+                logger.error(f"Error in system log flush listener: {e}")
+
+
+# Shared batcher; idle until start() is called
+system_log_batcher = SystemLogBatcher()
@@ -0,0 +1,106 @@
+"""
+Database migration script to add composite indexes for the common
+list/filter queries and move shared index names to table-qualified ones.
+Index names used to collide across analyses, reports, scheduled_tasks and
+watchlist, which broke create_all on a fresh SQLite database.
+"""
+
+import sqlite3
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Old (mostly table-agnostic) index names that models.py no longer declares on these tables
+LEGACY_INDEXES = {
+    "reports": ["idx_user_ticker", "idx_user_status"],
+    "scheduled_tasks": ["idx_user_status", "idx_ticker_date", "idx_status_type"],
+    "watchlist": ["idx_user_ticker", "idx_user_priority", "idx_ticker_alerts", "idx_watchlist_user_priority"],
+}
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_analyses_user_created ON analyses(user_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_analyses_user_ticker_created ON analyses(user_id, ticker, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_reports_user_status ON reports(user_id, status)",
+    "CREATE INDEX IF NOT EXISTS idx_reports_user_created ON reports(user_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_reports_user_ticker_created ON reports(user_id, ticker, created_at)",
+    # Conflict target for the save_unified_report upsert
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_report_analysis_user ON reports(analysis_id, user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_scheduled_tasks_user_status ON scheduled_tasks(user_id, status)",
+    "CREATE INDEX IF NOT EXISTS idx_scheduled_tasks_ticker_date ON scheduled_tasks(ticker, analysis_date)",
+    "CREATE INDEX IF NOT EXISTS idx_scheduled_tasks_status_type ON scheduled_tasks(status, schedule_type)",
+    "CREATE INDEX IF NOT EXISTS idx_watchlist_user_priority_ticker ON watchlist(user_id, priority, ticker)",
+    "CREATE INDEX IF NOT EXISTS idx_watchlist_ticker_alerts ON watchlist(ticker, alerts_enabled)",
+]
+
+# The old read-then-write report save could race into duplicate (analysis_id, user_id) rows,
+# which would make the unique index fail; keep only the most recently updated one of each
+DEDUPLICATE_REPORTS = """
+DELETE FROM reports WHERE rowid IN (
+    SELECT rowid FROM (
+        SELECT rowid, ROW_NUMBER() OVER (
+            PARTITION BY analysis_id, user_id ORDER BY updated_at DESC, rowid DESC
+        ) AS rn
+        FROM reports
+    ) WHERE rn > 1
+)
+"""
+
+
+def migrate_indexes(db_path: str = "data/tradingagents.db"):
+    """Create composite indexes, dropping legacy index names they replace and duplicate reports
+    that would block the unique report index. Raises if any index cannot be created."""
+
+    # Convert to absolute path
+    if not Path(db_path).is_absolute():
+        db_path = Path(__file__).parent.parent.parent / db_path
+
+    logger.info(f"Migrating indexes in database at: {db_path}")
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tables = {row[0] for row in cursor.fetchall()}
+
+        # Drop legacy names only where they belong to the table being migrated
+        for table, index_names in LEGACY_INDEXES.items():
+            for index_name in index_names:
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type='index' AND name=? AND tbl_name=?",
+                    (index_name, table)
+                )
+                if cursor.fetchone():
+                    cursor.execute(f"DROP INDEX {index_name}")
+                    logger.info(f"Dropped legacy index {index_name} on {table}")
+
+        if "reports" in tables:
+            cursor.execute(DEDUPLICATE_REPORTS)
+            if cursor.rowcount:
+                logger.warning(f"Removed {cursor.rowcount} duplicate reports before adding uq_report_analysis_user")
+
+        # Any failure aborts the migration: save_unified_report depends on uq_report_analysis_user
+        for index_sql in INDEXES:
+            table = index_sql.split(" ON ")[1].split("(")[0]
+            if table not in tables:
+                logger.info(f"Table {table} does not exist, skipping: {index_sql}")
+                continue
+            cursor.execute(index_sql)
+            logger.info(f"Created index: {index_sql.split('EXISTS ')[1].split(' ')[0]}")
+
+        conn.commit()
+        logger.info("Index migration completed successfully")
+
+    except Exception as e:
+        logger.error(f"Index migration failed: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    migrate_indexes()
@@ -3,11 +3,16 @@ SQLAlchemy ORM models for TradingAgents database.
 Defines all database tables and relationships.
 """
 
-from sqlalchemy import Column, String, Integer, Float, Boolean, Text, DateTime, JSON, ForeignKey, Index
+from sqlalchemy import Column, String, Integer, Float, Boolean, Text, DateTime, JSON, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
 import uuid
+from datetime import date
+
+# Large JSON payloads: binary JSONB on PostgreSQL (compressed, indexable), plain JSON elsewhere
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
 
 
 class User(Base):
@@ -71,6 +76,9 @@ class Analysis(Base):
         Index('idx_user_ticker', 'user_id', 'ticker'),
         Index('idx_user_date', 'user_id', 'analysis_date'),
         Index('idx_ticker_date', 'ticker', 'analysis_date'),
+        # Newest-first history per user (and ticker) is read straight off the index, no sort
+        Index('idx_analyses_user_created', 'user_id', 'created_at'),
+        Index('idx_analyses_user_ticker_created', 'user_id', 'ticker', 'created_at'),
     )
     
     def __repr__(self):
@@ -98,7 +106,7 @@ class Report(Base):
     #   "investment_plan": "...", 
     #   "final_trade_decision": "..."
     # }
-    sections = Column(JSON, nullable=False)  # All report sections in one JSON field
+    sections = Column(JSONDocument, nullable=False)  # All report sections in one JSON field
     
     # Status
     status = Column(String(50), default="generated", index=True)  # generated, reviewed, archived
@@ -114,10 +122,14 @@ class Report(Base):
     # Indexes for common queries
     __table_args__ = (
         Index('idx_analysis_id', 'analysis_id'),
-        Index('idx_user_ticker', 'user_id', 'ticker'),
         Index('idx_analysis_created', 'analysis_id', 'created_at'),
         Index('idx_ticker_created', 'ticker', 'created_at'),
-        Index('idx_user_status', 'user_id', 'status'),
+        Index('idx_reports_user_status', 'user_id', 'status'),
+        # Serve "latest reports for user (and ticker)" listings without a sort
+        Index('idx_reports_user_created', 'user_id', 'created_at'),
+        Index('idx_reports_user_ticker_created', 'user_id', 'ticker', 'created_at'),
+        # One unified report per analysis; also the upsert conflict target
+        UniqueConstraint('analysis_id', 'user_id', name='uq_report_analysis_user'),
     )
     
     def __repr__(self):
@@ -215,7 +227,7 @@ class SystemLog(Base):
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     event_type = Column(String(100), nullable=False, index=True)
-    event_data = Column(JSON)
+    event_data = Column(JSONDocument)
     
     # Timestamps
     timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -229,6 +241,10 @@ class SystemLog(Base):
         return f"<SystemLog(event_type='{self.event_type}', timestamp='{self.timestamp}')>"
 
 
+# schedule_type values registered with APScheduler; "immediate" tasks run once on creation
+SCHEDULED_TASK_TYPES = ("once", "daily", "weekly", "monthly", "cron")
+
+
 class ScheduledTask(Base):
     """Task model for all analysis tasks - supports both scheduled execution and immediate execution."""
     __tablename__ = "scheduled_tasks"
@@ -280,10 +296,10 @@ class ScheduledTask(Base):
     # Indexes for common queries
     __table_args__ = (
         Index('idx_user_enabled', 'user_id', 'enabled'),
-        Index('idx_user_status', 'user_id', 'status'),
+        Index('idx_scheduled_tasks_user_status', 'user_id', 'status'),
         Index('idx_schedule_type', 'schedule_type'),
-        Index('idx_ticker_date', 'ticker', 'analysis_date'),
-        Index('idx_status_type', 'status', 'schedule_type'),
+        Index('idx_scheduled_tasks_ticker_date', 'ticker', 'analysis_date'),
+        Index('idx_scheduled_tasks_status_type', 'status', 'schedule_type'),
     )
     
     def __repr__(self):
@@ -299,7 +315,7 @@ class Watchlist(Base):
     ticker = Column(String(20), nullable=False, index=True)
     
     # Additional metadata
-    added_date = Column(String(20))  # YYYY-MM-DD format when stock was added
+    added_date = Column(String(20), default=lambda: date.today().isoformat())  # YYYY-MM-DD format when stock was added
     notes = Column(String(1000))  # Optional user notes about the stock
     priority = Column(Integer, default=1)  # Priority level (1=highest, 5=lowest)
     alerts_enabled = Column(Boolean, default=True)  # Whether to send alerts for this stock
@@ -313,9 +329,11 @@ class Watchlist(Base):
     
     # Indexes for common queries
     __table_args__ = (
-        Index('idx_user_ticker', 'user_id', 'ticker'),
-        Index('idx_user_priority', 'user_id', 'priority'),
-        Index('idx_ticker_alerts', 'ticker', 'alerts_enabled'),
+        # Covers the (user_id) filter + (priority, ticker) order of the watchlist reads;
+        # on PostgreSQL the INCLUDE columns make the detailed listing index-only
+        Index('idx_watchlist_user_priority_ticker', 'user_id', 'priority', 'ticker',
+              postgresql_include=['id', 'added_date', 'notes', 'alerts_enabled']),
+        Index('idx_watchlist_ticker_alerts', 'ticker', 'alerts_enabled'),
         # Unique constraint: one ticker per user
         Index('idx_unique_user_ticker', 'user_id', 'ticker', unique=True),
     )
@@ -5,14 +5,24 @@ Maintains the same API interface for backward compatibility.
 """
 
 import json
-from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional, Union
+import itertools
+import time
+from copy import deepcopy
+from functools import wraps
+from hashlib import blake2b
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence, TypedDict, Union
 import logging
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, asc
-from sqlalchemy.exc import IntegrityError
+from contextlib import contextmanager
+from sqlalchemy.orm import Session, raiseload
+from sqlalchemy import and_, or_, desc, asc, case, event, func, bindparam, exists, select, insert, update, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
-from .database import SessionLocal
+from .database import SessionLocal, SHARED_TRANSACTION
+from .cache import make_cache
+from .log_batcher import SYSTEM_LOG_INSERT, system_log_batcher
 from .models import (
     User, Analysis, Report, Notification, SystemConfig,
     UserConfig, CacheEntry, SystemLog, ScheduledTask, Watchlist
@@ -20,6 +30,226 @@ from .models import (
 
 logger = logging.getLogger(__name__)
 
+# Shared defaults for JSON columns; serialized on insert and never mutated
+_EMPTY_LIST = ()
+_EMPTY_DICT = {}
+
+# Column whitelists for update_scheduled_task, computed once at import
+_TASK_COLUMNS = frozenset(c.name for c in ScheduledTask.__table__.columns)
+_TASK_DATETIME_COLUMNS = frozenset({"last_run", "started_at", "completed_at"})
+
+# System configs are read far more often than written; shared across workers via Redis when configured
+_config_cache = make_cache("system_config", maxsize=256, ttl=60)
+
+# Per-user settings, invalidated by save_user_config
+_user_config_cache = make_cache("user_config", maxsize=10000, ttl=60)
+
+# Watchlist reads repeat on every UI refresh and alert scan; short TTL, invalidated on writes
+_watchlist_cache = make_cache("watchlist", maxsize=1024, ttl=10)
+
+# Report listings (and the statistics built on them) per user and filter set. Keys carry a
+# per-user version that every report write replaces, so all variants go stale at once
+_reports_cache = make_cache("reports", maxsize=512, ttl=30)
+# The per-user versions live apart from the listings: they must never expire or be evicted,
+# or listings cached under an older version would become reachable again
+_report_versions = make_cache("report_versions", maxsize=None, ttl=None)
+
+# Distinct event types change rarely; invalidated when this process logs a new type
+_event_types_cache = make_cache("event_types", maxsize=1, ttl=60)
+_known_event_types = set()
+
+
+def _note_event_types(event_types: Iterable[str]):
+    """Record event types whose rows have been committed, retiring the cached list on a new one."""
+    new_types = set(event_types) - _known_event_types
+    if new_types:
+        _known_event_types.update(new_types)
+        _event_types_cache.delete("all")
+
+
+# Queued events count as logged only once their batch is written
+system_log_batcher.add_flush_listener(lambda rows: _note_event_types(row["event_type"] for row in rows))
+
+# Column projections for read paths that only serialize rows to dicts
+_USER_COLUMNS = (User.user_id, User.email, User.name, User.status, User.created_at, User.updated_at)
+_REPORT_COLUMNS = (
+    Report.report_id, Report.analysis_id, Report.user_id, Report.ticker, Report.title,
+    Report.sections, Report.status, Report.created_at, Report.updated_at
+)
+# Same as _REPORT_COLUMNS minus sections, which can run to megabytes per row
+_REPORT_SUMMARY_COLUMNS = tuple(c for c in _REPORT_COLUMNS if c is not Report.sections)
+_REPORT_KEYS = tuple(c.key for c in _REPORT_COLUMNS)
+_REPORT_SUMMARY_KEYS = tuple(c.key for c in _REPORT_SUMMARY_COLUMNS)
+_ANALYSIS_KEYS = (
+    "analysis_id", "user_id", "ticker", "analysts", "research_depth", "llm_provider",
+    "model_config", "final_state", "status", "analysis_date", "created_at", "updated_at"
+)
+# final_state is the full agent graph state, by far the largest column; omitted from summaries
+_ANALYSIS_SUMMARY_KEYS = tuple(key for key in _ANALYSIS_KEYS if key != "final_state")
+
+# Prebuilt statements for the hottest single-row lookups; built once, bound per call
+_GET_USER_STMT = select(*_USER_COLUMNS).where(User.user_id == bindparam("user_id"))
+_GET_REPORT_STMT = select(*_REPORT_COLUMNS).where(
+    and_(Report.user_id == bindparam("user_id"), Report.report_id == bindparam("report_id"))
+)
+_GET_USER_CONFIG_STMT = (
+    select(UserConfig.config_data).where(UserConfig.user_id == bindparam("user_id")).limit(1)
+)
+# Task dicts only read columns; raiseload turns any accidental user/analysis lazy load into an error
+_GET_SCHEDULED_TASK_STMT = (
+    select(ScheduledTask).options(raiseload("*")).where(ScheduledTask.task_id == bindparam("task_id"))
+)
+_WATCHLIST_DETAILED_STMT = (
+    select(
+        Watchlist.id, Watchlist.ticker, Watchlist.added_date, Watchlist.notes,
+        Watchlist.priority, Watchlist.alerts_enabled, Watchlist.created_at, Watchlist.updated_at
+    )
+    .where(Watchlist.user_id == bindparam("user_id"))
+    .order_by(Watchlist.priority, Watchlist.ticker)
+)
+# Ticker-only read; index-only via idx_watchlist_user_priority_ticker
+_WATCHLIST_TICKERS_STMT = (
+    select(Watchlist.ticker).where(Watchlist.user_id == bindparam("user_id"))
+    .order_by(Watchlist.priority, Watchlist.ticker)
+)
+_WATCHLIST_ITEM_STMT = select(Watchlist).where(
+    and_(Watchlist.user_id == bindparam("user_id"), Watchlist.ticker == bindparam("ticker"))
+)
+_WATCHLIST_COUNT_STMT = (
+    select(func.count()).select_from(Watchlist).where(Watchlist.user_id == bindparam("user_id"))
+)
+
+# Columns update_user may write; identity columns are never reassigned
+_USER_UPDATE_COLUMNS = frozenset(c.name for c in User.__table__.columns) - {"id", "user_id"}
+
+# Task statuses that stamp completed_at
+_FINISHED_TASK_STATUSES = frozenset({"completed", "failed", "error"})
+
+# Watchlist item fields callers may change
+_WATCHLIST_UPDATE_COLUMNS = frozenset({"notes", "priority", "alerts_enabled"})
+
+# Per-process sequence that keeps generated IDs unique within the same nanosecond
+_id_sequence = itertools.count()
+
+
+# Not memoized: aware datetimes for one instant in different offsets hash equal, so a
+# cache keyed on the datetime would hand back another offset's string
+def _iso(dt: Optional[datetime]) -> Optional[str]:
+    """ISO-format a timestamp (None passes through)."""
+    return dt.isoformat() if dt else None
+
+
+def _iso_z(dt: Optional[datetime]) -> Optional[str]:
+    """Like _iso, with the 'Z' suffix the legacy list endpoints expect."""
+    return dt.isoformat() + 'Z' if dt else None
+
+
+def _user_dict(row) -> Dict[str, Any]:
+    """Serialize a _USER_COLUMNS row."""
+    user_id, email, name, status, created_at, updated_at = row
+    return {
+        "user_id": user_id,
+        "email": email,
+        "name": name,
+        "status": status,
+        "created_at": _iso(created_at),
+        "updated_at": _iso(updated_at)
+    }
+
+
+class ReportRow(TypedDict, total=False):
+    """Shape of a report row from _report_dict; every projected key is always present.
+
+    sections is NOT NULL, so full rows carry a dict and summary rows omit the key.
+    """
+    report_id: str
+    analysis_id: str
+    user_id: str
+    ticker: str
+    title: Optional[str]
+    sections: Dict[str, Any]
+    status: str
+    created_at: Optional[str]
+    updated_at: Optional[str]
+    date: Optional[str]
+
+
+def _report_dict(row, keys=_REPORT_KEYS, iso=_iso) -> ReportRow:
+    """Serialize a _REPORT_COLUMNS (or _REPORT_SUMMARY_COLUMNS) row, formatting timestamps with `iso`."""
+    item = dict(zip(keys, row))
+    item["created_at"] = iso(item["created_at"])
+    item["updated_at"] = iso(item["updated_at"])
+    return item
+
+
+def _analysis_dict(row, keys=_ANALYSIS_KEYS) -> Dict[str, Any]:
+    """Serialize an _ANALYSIS_KEYS (or _ANALYSIS_SUMMARY_KEYS) row."""
+    item = dict(zip(keys, row))
+    item["created_at"] = _iso(item["created_at"])
+    item["updated_at"] = _iso(item["updated_at"])
+    return item
+
+
+def _invalidate_on_commit(db: Session, invalidate):
+    """Run `invalidate` now and, inside a shared transaction, again once it commits."""
+    invalidate()
+    if db.info.get(SHARED_TRANSACTION):
+        # Readers may re-cache pre-commit rows meanwhile; retire them again after commit
+        event.listen(db, "after_commit", lambda *_: invalidate(), once=True)
+
+
+def _commit(db: Session):
+    """Commit an owned session; only flush when the caller shares its transaction."""
+    if db.info.get(SHARED_TRANSACTION):
+        db.flush()
+    else:
+        db.commit()
+
+
+def _report_id(user_id: str, analysis_id: str) -> str:
+    """Deterministic report ID for the (analysis_id, user_id) pair.
+    
+    Reports created before this scheme keep their old IDs; the upsert matches
+    on (analysis_id, user_id) and returns whichever ID is stored.
+    """
+    return "report_" + blake2b(f"{user_id}|{analysis_id}".encode(), digest_size=12).hexdigest()
+
+
+def _db_op(default=None):
+    """Return `default` instead of raising when a read fails at the database layer."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return fn(self, *args, **kwargs)
+            except SQLAlchemyError as e:
+                logger.error("Error in %s: %s", fn.__name__, e)
+                return deepcopy(default)
+        return wrapper
+    return decorator
+
+
+def _dialect_insert(db: Session):
+    """Return the dialect's ON CONFLICT-capable insert(), or None if unsupported."""
+    dialect = db.get_bind().dialect
+    if not dialect.insert_returning:
+        return None
+    if dialect.name == "postgresql":
+        return pg_insert
+    if dialect.name == "sqlite":
+        return sqlite_insert
+    return None
+
+
+def _utc_ago(**delta) -> datetime:
+    """Aware UTC cutoff `delta` before now, on the same clock as the func.now() server defaults."""
+    return datetime.now(timezone.utc) - timedelta(**delta)
+
+
+def _generate_id(prefix: str) -> str:
+    """Generate a unique, time-ordered record ID."""
+    return f"{prefix}_{time.time_ns()}_{next(_id_sequence):06x}"
+
 
 class DatabaseStorage:
     """Database-based storage manager using SQLAlchemy ORM."""
@@ -32,16 +262,53 @@ class DatabaseStorage:
         """Get database session."""
         return self.session_factory()
     
+    @contextmanager
+    def _session_scope(self, db: Optional[Session] = None) -> Iterator[Session]:
+        """Use the caller's session when given, otherwise open a short-lived one."""
+        if db is not None:
+            yield db
+            return
+        with self._get_session() as session:
+            yield session
+    
+    @contextmanager
+    def transaction(self) -> Iterator[Session]:
+        """Run several storage calls (passed `db=`) in one transaction, committed once at the end."""
+        with self._get_session() as db:
+            db.info[SHARED_TRANSACTION] = True
+            try:
+                yield db
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+    
+    @staticmethod
+    def _invalidate_watchlist(user_id: str):
+        """Drop cached watchlist reads for a user after a write."""
+        _watchlist_cache.delete(f"{user_id}:tickers")
+        _watchlist_cache.delete(f"{user_id}:detailed")
+        _watchlist_cache.delete(f"{user_id}:count")
+    
+    @staticmethod
+    def _invalidate_reports(user_id: str, db: Optional[Session] = None):
+        """Retire cached report listings for a user; inside a shared transaction, once it commits."""
+        def bump():
+            _report_versions.set(user_id, _generate_id("v"))
+        
+        if db is None:
+            bump()
+        else:
+            _invalidate_on_commit(db, bump)
+    
     def _get_timestamp(self) -> str:
         """Get current timestamp string."""
         return datetime.now().isoformat()
     
     def _format_datetime(self, dt) -> str:
         """Format datetime object to ISO string with timezone info."""
-        if dt is None:
-            return None
         # Ensure we add timezone info if not present
-        return dt.isoformat() + ('Z' if dt.tzinfo is None else '')
+        return _iso(dt) if dt is None or dt.tzinfo else _iso_z(dt)
     
     # User Management
     def create_user(self, user_id: str, user_data: Dict[str, Any]) -> bool:
@@ -63,73 +330,52 @@ class DatabaseStorage:
                 
                 db.add(user)
                 db.commit()
-                db.refresh(user)
                 
-                logger.info(f"Created user: {user_id}")
+                logger.info("Created user: %s", user_id)
                 return True
                 
         except Exception as e:
             logger.error(f"Error creating user {user_id}: {e}")
             return False
     
-    def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+    @_db_op(default=None)
+    def get_user(self, user_id: str, *, db: Optional[Session] = None) -> Optional[Dict[str, Any]]:
         """Get user data."""
-        try:
-            with self._get_session() as db:
-                user = db.query(User).filter(User.user_id == user_id).first()
-                if not user:
-                    return None
-                
-                return {
-                    "user_id": user.user_id,
-                    "email": user.email,
-                    "name": user.name,
-                    "status": user.status,
-                    "created_at": user.created_at.isoformat() if user.created_at else None,
-                    "updated_at": user.updated_at.isoformat() if user.updated_at else None
-                }
-        except Exception as e:
-            logger.error(f"Error getting user {user_id}: {e}")
-            return None
+        with self._session_scope(db) as db:
+            user = db.execute(_GET_USER_STMT, {"user_id": user_id}).first()
+            return _user_dict(user) if user else None
     
     def update_user(self, user_id: str, updates: Dict[str, Any]) -> bool:
         """Update user data."""
         try:
+            values = {key: value for key, value in updates.items() if key in _USER_UPDATE_COLUMNS}
+            
             with self._get_session() as db:
-                user = db.query(User).filter(User.user_id == user_id).first()
-                if not user:
-                    return False
-                
-                # Update fields
-                for key, value in updates.items():
-                    if hasattr(user, key):
-                        setattr(user, key, value)
-                
+                result = db.execute(
+                    update(User)
+                    .where(User.user_id == user_id)
+                    .values({"updated_at": func.now(), **values})
+                )
                 db.commit()
-                return True
+                return result.rowcount > 0
         except Exception as e:
             logger.error(f"Error updating user {user_id}: {e}")
             return False
     
+    @_db_op(default=[])
     def list_users(self) -> List[Dict[str, Any]]:
         """List all users."""
-        try:
-            with self._get_session() as db:
-                users = db.query(User).order_by(User.created_at).all()
-                return [
-                    {
-                        "user_id": user.user_id,
-                        "email": user.email,
-                        "name": user.name,
-                        "status": user.status,
-                        "created_at": user.created_at.isoformat() if user.created_at else None,
-                        "updated_at": user.updated_at.isoformat() if user.updated_at else None
-                    }
-                    for user in users
-                ]
-        except Exception as e:
-            logger.error(f"Error listing users: {e}")
-            return []
+        return list(self.iter_users())
+    
+    def iter_users(self, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Stream all users in batches without loading the whole table into memory."""
+        with self._get_session() as db:
+            stmt = (
+                select(*_USER_COLUMNS)
+                .order_by(User.created_at)
+                .execution_options(stream_results=True, yield_per=batch_size)
+            )
+            yield from map(_user_dict, db.execute(stmt))
     
     # Analysis Management
     def save_analysis(self, user_id: str, ticker: str, analysis_data: Dict[str, Any]) -> str:
@@ -155,75 +401,43 @@ class DatabaseStorage:
                 
                 db.add(analysis)
                 db.commit()
-                db.refresh(analysis)
                 
-                logger.info(f"Saved analysis: {analysis_id}")
+                logger.info("Saved analysis: %s", analysis_id)
                 return analysis_id
                 
         except Exception as e:
             logger.error(f"Error saving analysis for {ticker}: {e}")
             raise
     
-    def get_analysis(self, user_id: str, analysis_id: str) -> Optional[Dict[str, Any]]:
-        """Get specific analysis by ID."""
-        try:
-            with self._get_session() as db:
-                analysis = db.query(Analysis).filter(
-                    and_(Analysis.user_id == user_id, Analysis.analysis_id == analysis_id)
-                ).first()
-                
-                if not analysis:
-                    return None
-                
-                return {
-                    "analysis_id": analysis.analysis_id,
-                    "user_id": analysis.user_id,
-                    "ticker": analysis.ticker,
-                    "analysts": analysis.analysts,
-                    "research_depth": analysis.research_depth,
-                    "llm_provider": analysis.llm_provider,
-                    "model_config": analysis.model_config,
-                    "final_state": analysis.final_state,
-                    "status": analysis.status,
-                    "analysis_date": analysis.analysis_date,
-                    "created_at": analysis.created_at.isoformat() if analysis.created_at else None,
-                    "updated_at": analysis.updated_at.isoformat() if analysis.updated_at else None
-                }
-        except Exception as e:
-            logger.error(f"Error getting analysis {analysis_id}: {e}")
-            return None
+    @_db_op(default=None)
+    def get_analysis(self, user_id: str, analysis_id: str, include_state: bool = True) -> Optional[Dict[str, Any]]:
+        """Get specific analysis by ID; include_state=False skips the heavy final_state column."""
+        keys = _ANALYSIS_KEYS if include_state else _ANALYSIS_SUMMARY_KEYS
+        with self._get_session() as db:
+            analysis = db.execute(
+                select(*(getattr(Analysis, key) for key in keys))
+                .where(and_(Analysis.user_id == user_id, Analysis.analysis_id == analysis_id))
+            ).first()
+            
+            if not analysis:
+                return None
+            
+            return _analysis_dict(analysis, keys)
     
-    def list_analysis(self, user_id: str, ticker: str = None, limit: int = 50) -> List[Dict[str, Any]]:
-        """List user's analysis results."""
-        try:
-            with self._get_session() as db:
-                query = db.query(Analysis).filter(Analysis.user_id == user_id)
-                
-                if ticker:
-                    query = query.filter(Analysis.ticker == ticker)
-                
-                analyses = query.order_by(desc(Analysis.created_at)).limit(limit).all()
-                
-                return [
-                    {
-                        "analysis_id": analysis.analysis_id,
-                        "user_id": analysis.user_id,
-                        "ticker": analysis.ticker,
-                        "analysts": analysis.analysts,
-                        "research_depth": analysis.research_depth,
-                        "llm_provider": analysis.llm_provider,
-                        "model_config": analysis.model_config,
-                        "final_state": analysis.final_state,
-                        "status": analysis.status,
-                        "analysis_date": analysis.analysis_date,
-                        "created_at": analysis.created_at.isoformat() if analysis.created_at else None,
-                        "updated_at": analysis.updated_at.isoformat() if analysis.updated_at else None
-                    }
-                    for analysis in analyses
-                ]
-        except Exception as e:
-            logger.error(f"Error listing analyses: {e}")
-            return []
+    @_db_op(default=[])
+    def list_analysis(self, user_id: str, ticker: str = None, limit: int = 50,
+                      include_state: bool = True) -> List[Dict[str, Any]]:
+        """List user's analysis results; include_state=False skips the heavy final_state column."""
+        keys = _ANALYSIS_KEYS if include_state else _ANALYSIS_SUMMARY_KEYS
+        with self._get_session() as db:
+            query = select(*(getattr(Analysis, key) for key in keys)).where(Analysis.user_id == user_id)
+            
+            if ticker:
+                query = query.where(Analysis.ticker == ticker)
+            
+            analyses = db.execute(query.order_by(desc(Analysis.created_at)).limit(limit)).all()
+            
+            return [_analysis_dict(row, keys) for row in analyses]
     
     def delete_analysis(self, user_id: str, analysis_id: str) -> bool:
         """Delete specific analysis by ID."""
@@ -238,18 +452,51 @@ class DatabaseStorage:
                 
                 db.delete(analysis)
                 db.commit()
+                # Its reports are removed by cascade
+                self._invalidate_reports(user_id)
                 
-                logger.info(f"Deleted analysis {analysis_id} for user {user_id}")
+                logger.info("Deleted analysis %s for user %s", analysis_id, user_id)
                 return True
         except Exception as e:
             logger.error(f"Error deleting analysis {analysis_id}: {e}")
             return False
     
     # Report Management
-    def save_unified_report(self, analysis_id: str, user_id: str, ticker: str, sections: Dict[str, str], title: str = None) -> str:
+    def save_unified_report(self, analysis_id: str, user_id: str, ticker: str, sections: Dict[str, str], title: str = None,
+                            *, db: Optional[Session] = None) -> str:
         """Save a unified report with multiple sections for an analysis."""
+        ticker = ticker.upper()
         try:
-            with self._get_session() as db:
+            with self._session_scope(db) as db:
+                dialect_insert = _dialect_insert(db)
+                if dialect_insert is not None:
+                    # Single-statement upsert keyed on (analysis_id, user_id)
+                    stmt = dialect_insert(Report).values(
+                        report_id=_report_id(user_id, analysis_id),
+                        analysis_id=analysis_id,
+                        user_id=user_id,
+                        ticker=ticker,
+                        title=title or f"{ticker} Complete Analysis Report",
+                        sections=sections,
+                        status="generated"
+                    )
+                    # ON CONFLICT DO UPDATE skips Column.onupdate, so set the DB clock explicitly
+                    update_values = {"sections": stmt.excluded.sections, "updated_at": func.now()}
+                    if title:
+                        update_values["title"] = stmt.excluded.title
+                    
+                    report_id = db.execute(
+                        stmt.on_conflict_do_update(
+                            index_elements=[Report.analysis_id, Report.user_id],
+                            set_=update_values
+                        ).returning(Report.report_id)
+                    ).scalar_one()
+                    _commit(db)
+                    self._invalidate_reports(user_id, db)
+                    
+                    logger.info("Saved unified report: %s for analysis %s", report_id, analysis_id)
+                    return report_id
+                
                 # Check if report already exists for this analysis
                 existing_report = db.query(Report).filter(
                     and_(Report.analysis_id == analysis_id, Report.user_id == user_id)
@@ -259,30 +506,32 @@ class DatabaseStorage:
                     # Update existing report
                     existing_report.sections = sections
                     existing_report.title = title or existing_report.title
-                    existing_report.updated_at = datetime.now()
-                    db.commit()
-                    logger.info(f"Updated unified report: {existing_report.report_id} for analysis {analysis_id}")
+                    # Touch updated_at even when sections are unchanged
+                    existing_report.updated_at = func.now()
+                    _commit(db)
+                    self._invalidate_reports(user_id, db)
+                    logger.info("Updated unified report: %s for analysis %s", existing_report.report_id, analysis_id)
                     return existing_report.report_id
                 else:
                     # Generate report ID
-                    report_id = f"report_{ticker}_{analysis_id.split('_')[-1]}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                    report_id = _report_id(user_id, analysis_id)
                     
                     # Create new unified report record
                     report = Report(
                         report_id=report_id,
                         analysis_id=analysis_id,
                         user_id=user_id,
-                        ticker=ticker.upper(),
-                        title=title or f"{ticker.upper()} Complete Analysis Report",
+                        ticker=ticker,
+                        title=title or f"{ticker} Complete Analysis Report",
                         sections=sections,
                         status="generated"
                     )
                     
                     db.add(report)
-                    db.commit()
-                    db.refresh(report)
+                    _commit(db)
+                    self._invalidate_reports(user_id, db)
                     
-                    logger.info(f"Saved unified report: {report_id} for analysis {analysis_id}")
+                    logger.info("Saved unified report: %s for analysis %s", report_id, analysis_id)
                     return report_id
                 
         except Exception as e:
@@ -290,69 +539,66 @@ class DatabaseStorage:
             raise
     
  
-    def get_report(self, user_id: str, report_id: str) -> Optional[Dict[str, Any]]:
+    @_db_op(default=None)
+    def get_report(self, user_id: str, report_id: str, *, db: Optional[Session] = None) -> Optional[ReportRow]:
         """Get specific unified report by ID."""
-        try:
-            with self._get_session() as db:
-                # Join with Analysis to get the analysis_date
-                report = db.query(Report).filter(
-                    and_(Report.user_id == user_id, Report.report_id == report_id)
-                ).first()
-                
-                if not report:
-                    return None
-                
-              
-                
-                return {
-                    "report_id": report.report_id,
-                    "analysis_id": report.analysis_id,
-                    "user_id": report.user_id,
-                    "ticker": report.ticker,
-                    "date": report.created_at.isoformat() if report.created_at else None,  # Get date from related Analysis
-                    "title": report.title,
-                    "sections": report.sections,  # Contains all report sections
-                    "status": report.status,
-                    "created_at": report.created_at.isoformat() if report.created_at else None,
-                    "updated_at": report.updated_at.isoformat() if report.updated_at else None
-                }
-        except Exception as e:
-            logger.error(f"Error getting report {report_id}: {e}")
-            return None
+        with self._session_scope(db) as db:
+            report = db.execute(
+                _GET_REPORT_STMT, {"user_id": user_id, "report_id": report_id}
+            ).first()
+            
+            if not report:
+                return None
+            
+            item = _report_dict(report)
+            item["date"] = item["created_at"]
+            return item
     
-    def list_reports(self, user_id: str, ticker: str = None, analysis_id: str = None,  limit: int = 50) -> List[Dict[str, Any]]:
-        """List unified reports with optional filters."""
-        try:
-            with self._get_session() as db:
-                query = db.query(Report).filter(Report.user_id == user_id)
-                
-                if ticker:
-                    query = query.filter(Report.ticker == ticker.upper())
-                if analysis_id:
-                    query = query.filter(Report.analysis_id == analysis_id)
+    @_db_op(default=[])
+    def list_reports(self, user_id: str, ticker: str = None, analysis_id: str = None,  limit: int = 50,
+                     include_sections: bool = True, created_after: datetime = None) -> List[ReportRow]:
+        """List unified reports with optional filters; include_sections=False skips the heavy sections column."""
+        # Time-windowed queries move with the clock, so only fixed filter sets are cached
+        cache_key = None
+        if created_after is None:
+            version = _report_versions.get(user_id)
+            if version is None:
+                # Start from a fresh unique version, never one an earlier listing could be cached under
+                version = _generate_id("v")
+                _report_versions.set(user_id, version)
+            cache_key = f"{user_id}:{version}:{ticker and ticker.upper()}:{analysis_id}:{limit}:{include_sections}"
+            cached = _reports_cache.get(cache_key)
+            if cached is not None:
+                # Callers annotate the returned dicts, so hand out copies
+                return [dict(item) for item in cached]
+        
+        with self._get_session() as db:
+            query = select(*(_REPORT_COLUMNS if include_sections else _REPORT_SUMMARY_COLUMNS))
+            query = query.where(Report.user_id == user_id)
+            
+            if ticker:
+                query = query.where(Report.ticker == ticker.upper())
+            if analysis_id:
+                query = query.where(Report.analysis_id == analysis_id)
+            if created_after:
+                query = query.where(Report.created_at >= created_after)
 
-                reports = query.order_by(desc(Report.created_at)).limit(limit).all()
-                
-                return [
-                    {
-                        "report_id": report.report_id,
-                        "analysis_id": report.analysis_id,
-                        "user_id": report.user_id,
-                        "ticker": report.ticker,
-                        "title": report.title,
-                        "sections": report.sections,
-                        "status": report.status,
-                        "created_at": report.created_at.isoformat() + 'Z' if report.created_at else None,
-                        "updated_at": report.updated_at.isoformat() + 'Z' if report.updated_at else None,
-                        # For backward compatibility, add derived fields
-                        "report_type": "unified_analysis",  # Indicate this is a unified report
-                        "content": report.sections  # Map sections to content for legacy compatibility
-                    }
-                    for report in reports
-                ]
-        except Exception as e:
-            logger.error(f"Error listing reports: {e}")
-            return []
+            reports = db.execute(query.order_by(desc(Report.created_at)).limit(limit)).all()
+            keys = _REPORT_KEYS if include_sections else _REPORT_SUMMARY_KEYS
+            
+            results = []
+            for report in reports:
+                item = _report_dict(report, keys, _iso_z)
+                # For backward compatibility, add derived fields
+                item["report_type"] = "unified_analysis"  # Indicate this is a unified report
+                if include_sections:
+                    item["content"] = item["sections"]  # Map sections to content for legacy compatibility
+                results.append(item)
+            
+            if cache_key is None:
+                return results
+            _reports_cache.set(cache_key, results)
+            return [dict(item) for item in results]
     
     def delete_report(self, user_id: str, report_id: str) -> bool:
         """Delete specific report by ID."""
@@ -367,45 +613,66 @@ class DatabaseStorage:
                 
                 db.delete(report)
                 db.commit()
+                self._invalidate_reports(user_id)
                 
-                logger.info(f"Deleted report {report_id} for user {user_id}")
+                logger.info("Deleted report %s for user %s", report_id, user_id)
                 return True
         except Exception as e:
             logger.error(f"Error deleting report {report_id}: {e}")
             return False
     
+    def delete_reports(self, user_id: str, report_ids: Sequence[str]) -> List[Dict[str, Any]]:
+        """Delete the user's reports among report_ids in one transaction; returns the deleted rows.
+
+        Database errors propagate so callers can tell a failed delete from missing reports.
+        """
+        if not report_ids:
+            return []
+        with self._get_session() as db:
+            owned = and_(Report.user_id == user_id, Report.report_id.in_(report_ids))
+            rows = db.execute(
+                select(Report.report_id, Report.analysis_id, Report.ticker, Report.title).where(owned)
+            ).all()
+            if not rows:
+                return []
+            db.execute(delete(Report).where(owned).execution_options(synchronize_session=False))
+            db.commit()
+            self._invalidate_reports(user_id)
+            
+            logger.info("Deleted %s reports for user %s", len(rows), user_id)
+            return [
+                {"report_id": report_id, "analysis_id": analysis_id, "ticker": ticker, "title": title}
+                for report_id, analysis_id, ticker, title in rows
+            ]
+    
   
-    def list_reports_by_ticker(self, user_id: str, ticker: str, report_type: str = None, limit: int = 50) -> List[Dict[str, Any]]:
+    @_db_op(default=[])
+    def list_reports_by_ticker(self, user_id: str, ticker: str, report_type: str = None, limit: int = 50,
+                               include_sections: bool = True) -> List[Dict[str, Any]]:
         """Get all reports for a specific ticker symbol."""
-        try:
-            with self._get_session() as db:
-                query = db.query(Report).filter(
-                    and_(Report.user_id == user_id, Report.ticker == ticker.upper())
-                )
-                
-                if report_type:
-                    query = query.filter(Report.report_type == report_type)
-                
-                reports = query.order_by(desc(Report.created_at)).limit(limit).all()
-                
-                return [
-                    {
-                        "report_id": report.report_id,
-                        "analysis_id": report.analysis_id,
-                        "user_id": report.user_id,
-                        "ticker": report.ticker,
-                        "report_type": report.report_type,
-                        "title": report.title,
-                        "content": report.content,
-                        "status": report.status,
-                        "created_at": report.created_at.isoformat() if report.created_at else None,
-                        "updated_at": report.updated_at.isoformat() if report.updated_at else None
-                    }
-                    for report in reports
-                ]
-        except Exception as e:
-            logger.error(f"Error listing reports for ticker {ticker}: {e}")
+        # All reports are unified; there is no per-report type column
+        if report_type and report_type != "unified_analysis":
             return []
+        
+        with self._get_session() as db:
+            reports = db.execute(
+                select(*(_REPORT_COLUMNS if include_sections else _REPORT_SUMMARY_COLUMNS))
+                .where(and_(Report.user_id == user_id, Report.ticker == ticker.upper()))
+                .order_by(desc(Report.created_at))
+                .limit(limit)
+            ).all()
+            
+            keys = _REPORT_KEYS if include_sections else _REPORT_SUMMARY_KEYS
+            
+            results = []
+            for report in reports:
+                item = _report_dict(report, keys)
+                item["report_type"] = "unified_analysis"
+                if include_sections:
+                    item["content"] = item.pop("sections")
+                results.append(item)
+            
+            return results
     
     # Configuration Management
     def save_config(self, config_name: str, config_data: Dict[str, Any]):
@@ -426,57 +693,59 @@ class DatabaseStorage:
                     db.add(config)
                 
                 db.commit()
+                _config_cache.delete(config_name)
         except Exception as e:
             logger.error(f"Error saving config {config_name}: {e}")
             raise
     
+    @_db_op(default={})
     def get_config(self, config_name: str) -> Dict[str, Any]:
         """Get system configuration."""
-        try:
-            with self._get_session() as db:
-                config = db.query(SystemConfig).filter(SystemConfig.config_name == config_name).first()
-                
-                if config:
-                    return config.config_data
-                return {}
-        except Exception as e:
-            logger.error(f"Error getting config {config_name}: {e}")
-            return {}
+        cached = _config_cache.get(config_name)
+        if cached is not None:
+            # Deep copy: nested values must not be shared with the process-local cache
+            return deepcopy(cached)
+        
+        with self._get_session() as db:
+            config = db.query(SystemConfig).filter(SystemConfig.config_name == config_name).first()
+            
+            config_data = (config.config_data if config else None) or {}
+            _config_cache.set(config_name, deepcopy(config_data))
+            return config_data
     
-    def save_user_config(self, user_id: str, config_data: Dict[str, Any]):
+    def save_user_config(self, user_id: str, config_data: Dict[str, Any], *, db: Optional[Session] = None):
         """Save user-specific configuration."""
         try:
-            with self._get_session() as db:
-                user_config = db.query(UserConfig).filter(UserConfig.user_id == user_id).first()
-                
-                if user_config:
-                    # Update existing config
-                    user_config.config_data = config_data
-                else:
-                    # Create new config
-                    user_config = UserConfig(
-                        user_id=user_id,
-                        config_data=config_data
-                    )
-                    db.add(user_config)
+            with self._session_scope(db) as db:
+                # Update in place; insert only when the user has no config row yet
+                result = db.execute(
+                    update(UserConfig)
+                    .where(UserConfig.user_id == user_id)
+                    .values(config_data=config_data)
+                )
+                if result.rowcount == 0:
+                    db.execute(insert(UserConfig).values(user_id=user_id, config_data=config_data))
                 
-                db.commit()
+                _commit(db)
+                _invalidate_on_commit(db, lambda: _user_config_cache.delete(user_id))
         except Exception as e:
             logger.error(f"Error saving user config for {user_id}: {e}")
             raise
     
-    def get_user_config(self, user_id: str) -> Dict[str, Any]:
+    @_db_op(default={})
+    def get_user_config(self, user_id: str, *, db: Optional[Session] = None) -> Dict[str, Any]:
         """Get user-specific configuration."""
-        try:
-            with self._get_session() as db:
-                user_config = db.query(UserConfig).filter(UserConfig.user_id == user_id).first()
-                
-                if user_config:
-                    return user_config.config_data
-                return {}
-        except Exception as e:
-            logger.error(f"Error getting user config for {user_id}: {e}")
-            return {}
+        cached = _user_config_cache.get(user_id)
+        if cached is not None:
+            # Nested values (analyst lists, settings dicts) must not be shared with the cache
+            return deepcopy(cached)
+        
+        with self._session_scope(db) as db:
+            config_data = db.execute(_GET_USER_CONFIG_STMT, {"user_id": user_id}).scalar() or {}
+            # A shared transaction may still roll back; only cache committed rows
+            if not db.info.get(SHARED_TRANSACTION):
+                _user_config_cache.set(user_id, deepcopy(config_data))
+            return config_data
     
     # Cache Management
     def save_cache(self, cache_key: str, data: Any, ttl_hours: int = 24):
@@ -504,48 +773,49 @@ class DatabaseStorage:
         except Exception as e:
             logger.error(f"Error saving cache {cache_key}: {e}")
     
+    @_db_op(default=None)
     def get_cache(self, cache_key: str) -> Optional[Any]:
         """Get data from cache if not expired."""
-        try:
-            with self._get_session() as db:
-                cache_entry = db.query(CacheEntry).filter(
-                    and_(
-                        CacheEntry.cache_key == cache_key,
-                        CacheEntry.expires_at > datetime.now()
-                    )
-                ).first()
-                
-                if cache_entry:
-                    return cache_entry.data
-                return None
-        except Exception as e:
-            logger.error(f"Error getting cache {cache_key}: {e}")
+        with self._get_session() as db:
+            cache_entry = db.query(CacheEntry).filter(
+                and_(
+                    CacheEntry.cache_key == cache_key,
+                    CacheEntry.expires_at > datetime.now()
+                )
+            ).first()
+            
+            if cache_entry:
+                return cache_entry.data
             return None
     
     def clear_expired_cache(self):
         """Clear all expired cache entries."""
         try:
             with self._get_session() as db:
-                expired_entries = db.query(CacheEntry).filter(
-                    CacheEntry.expires_at <= datetime.now()
-                ).all()
-                
-                for entry in expired_entries:
-                    db.delete(entry)
-                
+                result = db.execute(
+                    delete(CacheEntry)
+                    .where(CacheEntry.expires_at <= datetime.now())
+                    .execution_options(synchronize_session=False)
+                )
                 db.commit()
-                logger.info(f"Cleared {len(expired_entries)} expired cache entries")
+                
+                logger.info("Cleared %s expired cache entries", result.rowcount)
+                return result.rowcount
         except Exception as e:
             logger.error(f"Error clearing expired cache: {e}")
+            return 0
     
     # Notification Management
     def save_notification(self, user_id: str, notification: Dict[str, Any]) -> str:
         """Save user notification."""
+        return self.create_notification(user_id, notification)["notification_id"]
+    
+    def create_notification(self, user_id: str, notification: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a notification and return its ID and server-assigned created_at."""
         try:
             with self._get_session() as db:
-                notification_id = f"notif_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
-                
-                notif = Notification(
+                notification_id = _generate_id("notif")
+                stmt = insert(Notification).values(
                     notification_id=notification_id,
                     user_id=user_id,
                     title=notification.get("title", ""),
@@ -554,186 +824,360 @@ class DatabaseStorage:
                     data=notification.get("data", {}),
                     read=notification.get("read", False)
                 )
-                
-                db.add(notif)
+                if db.get_bind().dialect.insert_returning:
+                    created_at = db.execute(stmt.returning(Notification.created_at)).scalar_one()
+                else:
+                    # No RETURNING (e.g. SQLite before 3.35): read the server default back
+                    db.execute(stmt)
+                    created_at = db.execute(
+                        select(Notification.created_at).where(Notification.notification_id == notification_id)
+                    ).scalar_one()
                 db.commit()
-                db.refresh(notif)
                 
-                return notification_id
+                return {
+                    "notification_id": notification_id,
+                    "created_at": _iso(created_at)
+                }
         except Exception as e:
             logger.error(f"Error saving notification for user {user_id}: {e}")
             raise
     
-    def get_notifications(self, user_id: str, unread_only: bool = False, limit: int = 50) -> List[Dict[str, Any]]:
-        """Get user notifications."""
+    def save_notifications(self, user_id: str, notifications: List[Dict[str, Any]]) -> List[str]:
+        """Save a batch of user notifications in a single transaction."""
         try:
             with self._get_session() as db:
-                query = db.query(Notification).filter(Notification.user_id == user_id)
-                
-                if unread_only:
-                    query = query.filter(Notification.read == False)
-                
-                notifications = query.order_by(desc(Notification.created_at)).limit(limit).all()
-                
-                return [
+                rows = [
                     {
-                        "notification_id": notif.notification_id,
-                        "user_id": notif.user_id,
-                        "title": notif.title,
-                        "message": notif.message,
-                        "type": notif.type,
-                        "data": notif.data,
-                        "read": notif.read,
-                        "read_at": notif.read_at.isoformat() if notif.read_at else None,
-                        "created_at": notif.created_at.isoformat() if notif.created_at else None
+                        "notification_id": _generate_id("notif"),
+                        "user_id": user_id,
+                        "title": notification.get("title", ""),
+                        "message": notification.get("message", ""),
+                        "type": notification.get("type", "info"),
+                        "data": notification.get("data", {}),
+                        "read": notification.get("read", False)
                     }
-                    for notif in notifications
+                    for notification in notifications
                 ]
+                
+                if rows:
+                    # executemany: one round-trip for the whole batch
+                    db.execute(insert(Notification), rows)
+                    db.commit()
+                
+                return [row["notification_id"] for row in rows]
         except Exception as e:
-            logger.error(f"Error getting notifications for user {user_id}: {e}")
-            return []
+            logger.error(f"Error saving notifications for user {user_id}: {e}")
+            raise
+    
+    @_db_op(default=[])
+    def get_notifications(self, user_id: str, unread_only: bool = False, limit: int = 50) -> List[Dict[str, Any]]:
+        """Get user notifications."""
+        with self._get_session() as db:
+            query = db.query(Notification).filter(Notification.user_id == user_id)
+            
+            if unread_only:
+                query = query.filter(Notification.read == False)
+            
+            notifications = query.order_by(desc(Notification.created_at)).limit(limit).all()
+            
+            return [
+                {
+                    "notification_id": notif.notification_id,
+                    "user_id": notif.user_id,
+                    "title": notif.title,
+                    "message": notif.message,
+                    "type": notif.type,
+                    "data": notif.data,
+                    "read": notif.read,
+                    "read_at": _iso(notif.read_at),
+                    "created_at": _iso(notif.created_at)
+                }
+                for notif in notifications
+            ]
+    
+    @_db_op(default={"total": 0, "unread": 0})
+    def get_notification_counts(self, user_id: str) -> Dict[str, int]:
+        """Count a user's notifications and unread notifications in one aggregate query."""
+        with self._get_session() as db:
+            total, unread = db.execute(
+                select(
+                    func.count(),
+                    func.coalesce(func.sum(case((Notification.read.is_(False), 1), else_=0)), 0)
+                ).where(Notification.user_id == user_id)
+            ).one()
+            return {"total": total, "unread": unread}
     
     def mark_notification_read(self, user_id: str, notification_id: str) -> bool:
         """Mark notification as read."""
         try:
             with self._get_session() as db:
-                notification = db.query(Notification).filter(
-                    and_(
-                        Notification.user_id == user_id,
-                        Notification.notification_id == notification_id
+                result = db.execute(
+                    update(Notification)
+                    .where(
+                        and_(
+                            Notification.user_id == user_id,
+                            Notification.notification_id == notification_id
+                        )
                     )
-                ).first()
-                
-                if not notification:
-                    return False
-                
-                notification.read = True
-                notification.read_at = datetime.now()
+                    .values(read=True, read_at=func.now())
+                    .execution_options(synchronize_session=False)
+                )
                 db.commit()
                 
-                return True
+                return result.rowcount > 0
         except Exception as e:
             logger.error(f"Error marking notification {notification_id} as read: {e}")
             return False
     
-    # Logging and Monitoring
-    def log_system_event(self, event_type: str, event_data: Dict[str, Any]):
-        """Log system events."""
+    def mark_all_notifications_read(self, user_id: str) -> int:
+        """Mark all unread notifications for a user as read."""
         try:
             with self._get_session() as db:
-                log_entry = SystemLog(
-                    event_type=event_type,
-                    event_data=event_data
+                # synchronize_session=False: the session is discarded on exit, so
+                # in-session objects are not refreshed and may hold a stale `read`
+                updated = db.query(Notification).filter(
+                    and_(
+                        Notification.user_id == user_id,
+                        Notification.read == False
+                    )
+                ).update(
+                    {Notification.read: True, Notification.read_at: func.now()},
+                    synchronize_session=False
                 )
-                
-                db.add(log_entry)
                 db.commit()
+                
+                return updated
         except Exception as e:
-            logger.error(f"Error logging system event: {e}")
+            logger.error(f"Error marking all notifications as read for user {user_id}: {e}")
+            return 0
     
-    def get_system_logs(self, date_str: str = None, event_type: str = None) -> List[Dict[str, Any]]:
-        """Get system logs for a specific date."""
+    def delete_old_notifications(self, days: int = 30) -> int:
+        """Delete read notifications older than the given number of days."""
         try:
             with self._get_session() as db:
-                query = db.query(SystemLog)
-                
-                if date_str:
-                    # Filter by date
-                    date_obj = datetime.strptime(date_str, "%Y%m%d").date()
-                    start_of_day = datetime.combine(date_obj, datetime.min.time())
-                    end_of_day = datetime.combine(date_obj, datetime.max.time())
-                    query = query.filter(
+                cutoff = _utc_ago(days=days)
+                result = db.execute(
+                    delete(Notification)
+                    .where(
                         and_(
-                            SystemLog.timestamp >= start_of_day,
-                            SystemLog.timestamp <= end_of_day
+                            Notification.read == True,
+                            Notification.created_at < cutoff
                         )
                     )
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
                 
-                if event_type:
-                    query = query.filter(SystemLog.event_type == event_type)
-                
-                logs = query.order_by(desc(SystemLog.timestamp)).all()
-                
-                return [
-                    {
-                        "event_type": log.event_type,
-                        "timestamp": log.timestamp.isoformat() if log.timestamp else None,
-                        "data": log.event_data
-                    }
-                    for log in logs
-                ]
+                logger.info("Deleted %s notifications older than %s days", result.rowcount, days)
+                return result.rowcount
         except Exception as e:
-            logger.error(f"Error getting system logs: {e}")
-            return []
+            logger.error(f"Error deleting old notifications: {e}")
+            return 0
     
-    # Watchlist Management - Using dedicated Watchlist table
-    def get_user_watchlist(self, user_id: str) -> List[str]:
-        """Get user's watchlist ticker symbols."""
+    # Logging and Monitoring
+    def log_system_event(self, event_type: str, event_data: Dict[str, Any], sync: bool = False,
+                         *, db: Optional[Session] = None):
+        """Log system events; queued for a batched write unless sync=True, batching is off, or `db` is given."""
         try:
-            with self._get_session() as db:
-                watchlist_items = db.query(Watchlist).filter(
-                    Watchlist.user_id == user_id
-                ).order_by(Watchlist.priority, Watchlist.ticker).all()
-                
-                return [item.ticker for item in watchlist_items]
+            if db is not None:
+                # Part of the caller's transaction; a separate writer would block on SQLite's write lock
+                self._write_system_event(event_type, event_data, db=db)
+                if db.info.get(SHARED_TRANSACTION):
+                    # The row only exists once the caller's transaction commits
+                    event.listen(db, "after_commit", lambda *_: _note_event_types((event_type,)), once=True)
+                else:
+                    _note_event_types((event_type,))
+            elif sync or not system_log_batcher.submit(event_type, event_data):
+                self._write_system_event(event_type, event_data)
+                _note_event_types((event_type,))
+            # Otherwise queued: the batcher's flush listener records the type after it is written
         except Exception as e:
-            logger.error(f"Error getting watchlist for user {user_id}: {e}")
-            return []
+            logger.error(f"Error logging system event: {e}")
     
-    def get_user_watchlist_detailed(self, user_id: str) -> List[Dict[str, Any]]:
-        """Get user's watchlist with detailed information."""
+    def _write_system_event(self, event_type: str, event_data: Dict[str, Any], db: Optional[Session] = None):
+        """Insert a single system log row."""
+        with self._session_scope(db) as db:
+            # Append-only rows: a Core INSERT skips ORM instance construction and flush
+            db.execute(SYSTEM_LOG_INSERT, {"event_type": event_type, "event_data": event_data})
+            _commit(db)
+    
+    @_db_op(default=[])
+    def get_event_types(self) -> List[str]:
+        """Get the distinct system event types that have been logged."""
+        cached = _event_types_cache.get("all")
+        if cached is not None:
+            return list(cached)
+        
+        with self._get_session() as db:
+            event_types = sorted(db.execute(select(SystemLog.event_type).distinct()).scalars())
+        
+        _known_event_types.update(event_types)
+        _event_types_cache.set("all", event_types)
+        return list(event_types)
+    
+    @_db_op(default=[])
+    def get_system_logs(self, date_str: str = None, event_type: str = None) -> List[Dict[str, Any]]:
+        """Get system logs for a specific date."""
+        with self._get_session() as db:
+            query = select(SystemLog.event_type, SystemLog.timestamp, SystemLog.event_data)
+            
+            if date_str:
+                # Filter by date
+                date_obj = datetime.strptime(date_str, "%Y%m%d").date()
+                start_of_day = datetime.combine(date_obj, datetime.min.time())
+                end_of_day = datetime.combine(date_obj, datetime.max.time())
+                query = query.where(
+                    and_(
+                        SystemLog.timestamp >= start_of_day,
+                        SystemLog.timestamp <= end_of_day
+                    )
+                )
+            
+            if event_type:
+                query = query.where(SystemLog.event_type == event_type)
+            
+            logs = db.execute(query.order_by(desc(SystemLog.timestamp))).all()
+            
+            return [
+                {
+                    "event_type": event_type,
+                    "timestamp": _iso(timestamp),
+                    "data": event_data
+                }
+                for event_type, timestamp, event_data in logs
+            ]
+    
+    @_db_op(default={"total_events": 0, "event_types": {}})
+    def get_event_statistics(self, days: int = 7) -> Dict[str, Any]:
+        """Count system events per type over the last N days."""
+        with self._get_session() as db:
+            start_date = _utc_ago(days=days)
+            rows = db.execute(
+                select(SystemLog.event_type, func.count())
+                .where(SystemLog.timestamp >= start_date)
+                .group_by(SystemLog.event_type)
+            ).all()
+            
+            event_types = {event_type: count for event_type, count in rows}
+            return {
+                "total_events": sum(event_types.values()),
+                "event_types": event_types,
+                "period_days": days
+            }
+    
+    def cleanup_old_logs(self, days: int = 30) -> int:
+        """Delete system logs older than the given number of days."""
         try:
             with self._get_session() as db:
-                watchlist_items = db.query(Watchlist).filter(
-                    Watchlist.user_id == user_id
-                ).order_by(Watchlist.priority, Watchlist.ticker).all()
+                cutoff = _utc_ago(days=days)
+                result = db.execute(
+                    delete(SystemLog)
+                    .where(SystemLog.timestamp < cutoff)
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
                 
-                return [
-                    {
-                        "id": item.id,
-                        "ticker": item.ticker,
-                        "added_date": item.added_date,
-                        "notes": item.notes,
-                        "priority": item.priority,
-                        "alerts_enabled": item.alerts_enabled,
-                        "created_at": item.created_at.isoformat() if item.created_at else None,
-                        "updated_at": item.updated_at.isoformat() if item.updated_at else None
-                    }
-                    for item in watchlist_items
-                ]
+                logger.info("Deleted %s system logs older than %s days", result.rowcount, days)
+                return result.rowcount
         except Exception as e:
-            logger.error(f"Error getting detailed watchlist for user {user_id}: {e}")
-            return []
+            logger.error(f"Error cleaning up old logs: {e}")
+            return 0
+    
+    # Watchlist Management - Using dedicated Watchlist table
+    @_db_op(default=[])
+    def get_user_watchlist(self, user_id: str) -> List[str]:
+        """Get user's watchlist ticker symbols."""
+        cache_key = f"{user_id}:tickers"
+        cached = _watchlist_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        
+        with self._get_session() as db:
+            tickers = db.scalars(_WATCHLIST_TICKERS_STMT, {"user_id": user_id}).all()
+            _watchlist_cache.set(cache_key, tickers)
+            return list(tickers)
+    
+    @_db_op(default=[])
+    def get_user_watchlist_detailed(self, user_id: str) -> List[Dict[str, Any]]:
+        """Get user's watchlist with detailed information."""
+        cache_key = f"{user_id}:detailed"
+        cached = _watchlist_cache.get(cache_key)
+        if cached is not None:
+            return [dict(item) for item in cached]
+        
+        with self._get_session() as db:
+            rows = db.execute(_WATCHLIST_DETAILED_STMT, {"user_id": user_id}).all()
+            
+            detailed = [
+                {
+                    "id": item_id,
+                    "ticker": ticker,
+                    "added_date": added_date,
+                    "notes": notes,
+                    "priority": priority,
+                    "alerts_enabled": alerts_enabled,
+                    "created_at": _iso(created_at),
+                    "updated_at": _iso(updated_at)
+                }
+                for item_id, ticker, added_date, notes, priority, alerts_enabled, created_at, updated_at in rows
+            ]
+            _watchlist_cache.set(cache_key, detailed)
+            return [dict(item) for item in detailed]
+    
+    @_db_op(default=0)
+    def get_watchlist_count(self, user_id: str) -> int:
+        """Get the number of symbols in user's watchlist."""
+        cached = _watchlist_cache.get(f"{user_id}:tickers")
+        if cached is not None:
+            return len(cached)
+        
+        cache_key = f"{user_id}:count"
+        count = _watchlist_cache.get(cache_key)
+        if count is not None:
+            return count
+        
+        with self._get_session() as db:
+            # Direct SELECT COUNT(*) on the user_id index, no subquery wrapper
+            count = db.scalar(_WATCHLIST_COUNT_STMT, {"user_id": user_id}) or 0
+            _watchlist_cache.set(cache_key, count)
+            return count
     
     def add_to_watchlist(self, user_id: str, symbol: str, notes: str = None, priority: int = 1, alerts_enabled: bool = True) -> bool:
         """Add symbol to user's watchlist."""
         try:
             with self._get_session() as db:
                 symbol = symbol.upper()
+                values = {
+                    "user_id": user_id,
+                    "ticker": symbol,
+                    "notes": notes,
+                    "priority": priority,
+                    "alerts_enabled": alerts_enabled
+                }
                 
-                # Check if already exists
-                existing = db.query(Watchlist).filter(
-                    and_(Watchlist.user_id == user_id, Watchlist.ticker == symbol)
-                ).first()
-                
-                if existing:
-                    return False  # Already in watchlist
-                
-                # Create new watchlist item
-                watchlist_item = Watchlist(
-                    user_id=user_id,
-                    ticker=symbol,
-                    added_date=datetime.now().strftime('%Y-%m-%d'),
-                    notes=notes,
-                    priority=priority,
-                    alerts_enabled=alerts_enabled
-                )
+                dialect_insert = _dialect_insert(db)
+                if dialect_insert is not None:
+                    # Single INSERT; the unique (user_id, ticker) index turns duplicates into a no-op
+                    result = db.execute(
+                        dialect_insert(Watchlist).values(**values)
+                        .on_conflict_do_nothing(index_elements=[Watchlist.user_id, Watchlist.ticker])
+                    )
+                    if result.rowcount != 1:
+                        return False  # Already in watchlist
+                else:
+                    # Check if already exists
+                    existing = db.scalars(_WATCHLIST_ITEM_STMT, {"user_id": user_id, "ticker": symbol}).first()
+                    
+                    if existing:
+                        return False  # Already in watchlist
+                    
+                    db.add(Watchlist(**values))
                 
-                db.add(watchlist_item)
                 db.commit()
+                self._invalidate_watchlist(user_id)
                 
                 # Get updated count
-                count = db.query(Watchlist).filter(Watchlist.user_id == user_id).count()
+                count = db.scalar(_WATCHLIST_COUNT_STMT, {"user_id": user_id})
                 
                 self.log_system_event("watchlist_add", {
                     "user_id": user_id,
@@ -742,7 +1186,7 @@ class DatabaseStorage:
                     "priority": priority
                 })
                 
-                logger.info(f"Added {symbol} to watchlist for user {user_id}")
+                logger.info("Added %s to watchlist for user %s", symbol, user_id)
                 return True
                 
         except IntegrityError:
@@ -758,18 +1202,17 @@ class DatabaseStorage:
             with self._get_session() as db:
                 symbol = symbol.upper()
                 
-                watchlist_item = db.query(Watchlist).filter(
-                    and_(Watchlist.user_id == user_id, Watchlist.ticker == symbol)
-                ).first()
+                watchlist_item = db.scalars(_WATCHLIST_ITEM_STMT, {"user_id": user_id, "ticker": symbol}).first()
                 
                 if not watchlist_item:
                     return False  # Not in watchlist
                 
                 db.delete(watchlist_item)
                 db.commit()
+                self._invalidate_watchlist(user_id)
                 
                 # Get updated count
-                count = db.query(Watchlist).filter(Watchlist.user_id == user_id).count()
+                count = db.scalar(_WATCHLIST_COUNT_STMT, {"user_id": user_id})
                 
                 self.log_system_event("watchlist_remove", {
                     "user_id": user_id,
@@ -777,7 +1220,7 @@ class DatabaseStorage:
                     "watchlist_size": count
                 })
                 
-                logger.info(f"Removed {symbol} from watchlist for user {user_id}")
+                logger.info("Removed %s from watchlist for user %s", symbol, user_id)
                 return True
                 
         except Exception as e:
@@ -788,22 +1231,44 @@ class DatabaseStorage:
         """Update user's entire watchlist."""
         try:
             with self._get_session() as db:
-                # Remove all existing items
-                db.query(Watchlist).filter(Watchlist.user_id == user_id).delete()
+                desired = {symbol.upper() for symbol in symbols}
                 
-                # Add new items
-                symbols = list(set([symbol.upper() for symbol in symbols]))
-                for i, symbol in enumerate(sorted(symbols)):
-                    watchlist_item = Watchlist(
-                        user_id=user_id,
-                        ticker=symbol,
-                        added_date=datetime.now().strftime('%Y-%m-%d'),
-                        priority=1,  # Default priority
-                        alerts_enabled=True
+                # Only touch the difference; kept rows retain their notes, priority and added_date
+                db.execute(
+                    delete(Watchlist)
+                    .where(and_(Watchlist.user_id == user_id, Watchlist.ticker.notin_(desired)))
+                    .execution_options(synchronize_session=False)
+                )
+                
+                dialect_insert = _dialect_insert(db)
+                if dialect_insert is not None:
+                    # Symbols already present are skipped by the unique (user_id, ticker) index
+                    to_add = desired
+                    insert_stmt = dialect_insert(Watchlist.__table__).on_conflict_do_nothing(
+                        index_elements=[Watchlist.user_id, Watchlist.ticker]
                     )
-                    db.add(watchlist_item)
+                else:
+                    to_add = desired - set(db.scalars(select(Watchlist.ticker).where(Watchlist.user_id == user_id)))
+                    insert_stmt = Watchlist.__table__.insert()
+                
+                if to_add:
+                    # One date for the whole batch rather than the column default per row
+                    added_date = date.today().isoformat()
+                    # Table-level executemany: no ORM instance state or per-row flush bookkeeping
+                    db.execute(insert_stmt, [
+                        {
+                            "user_id": user_id,
+                            "ticker": symbol,
+                            "added_date": added_date,
+                            "priority": 1,  # Default priority
+                            "alerts_enabled": True
+                        }
+                        for symbol in sorted(to_add)
+                    ])
                 
                 db.commit()
+                self._invalidate_watchlist(user_id)
+                symbols = sorted(desired)
                 
                 self.log_system_event("watchlist_update", {
                     "user_id": user_id,
@@ -811,7 +1276,7 @@ class DatabaseStorage:
                     "watchlist_size": len(symbols)
                 })
                 
-                logger.info(f"Updated watchlist for user {user_id} with {len(symbols)} symbols")
+                logger.info("Updated watchlist for user %s with %s symbols", user_id, len(symbols))
                 return True
                 
         except Exception as e:
@@ -821,23 +1286,25 @@ class DatabaseStorage:
     def update_watchlist_item(self, user_id: str, symbol: str, updates: Dict[str, Any]) -> bool:
         """Update specific watchlist item properties."""
         try:
+            symbol = symbol.upper()
+            
+            # Update allowed fields
+            values = {key: value for key, value in updates.items() if key in _WATCHLIST_UPDATE_COLUMNS}
+            if not values:
+                return self.is_symbol_in_watchlist(user_id, symbol)
+            
             with self._get_session() as db:
-                symbol = symbol.upper()
-                
-                watchlist_item = db.query(Watchlist).filter(
-                    and_(Watchlist.user_id == user_id, Watchlist.ticker == symbol)
-                ).first()
-                
-                if not watchlist_item:
+                # Single UPDATE; rowcount tells whether the item exists
+                result = db.execute(
+                    update(Watchlist)
+                    .where(and_(Watchlist.user_id == user_id, Watchlist.ticker == symbol))
+                    .values(**values)
+                )
+                if result.rowcount == 0:
                     return False
                 
-                # Update allowed fields
-                allowed_fields = ['notes', 'priority', 'alerts_enabled']
-                for key, value in updates.items():
-                    if key in allowed_fields and hasattr(watchlist_item, key):
-                        setattr(watchlist_item, key, value)
-                
                 db.commit()
+                self._invalidate_watchlist(user_id)
                 
                 self.log_system_event("watchlist_item_update", {
                     "user_id": user_id,
@@ -851,70 +1318,144 @@ class DatabaseStorage:
             logger.error(f"Error updating watchlist item {symbol} for user {user_id}: {e}")
             return False
     
+    @_db_op(default=[])
+    def get_symbols_with_alerts(self, user_id: str = None) -> List[str]:
+        """Get the distinct watchlist tickers that have alerts enabled, optionally for one user."""
+        with self._get_session() as db:
+            # Served by idx_watchlist_ticker_alerts (ticker, alerts_enabled)
+            query = select(Watchlist.ticker).where(Watchlist.alerts_enabled.is_(True)).distinct()
+            if user_id:
+                query = query.where(Watchlist.user_id == user_id)
+            
+            return list(db.scalars(query.order_by(Watchlist.ticker)))
+    
+    @_db_op(default=False)
     def is_symbol_in_watchlist(self, user_id: str, symbol: str) -> bool:
         """Check if symbol is in user's watchlist."""
-        try:
-            with self._get_session() as db:
-                symbol = symbol.upper()
-                
-                exists = db.query(Watchlist).filter(
-                    and_(Watchlist.user_id == user_id, Watchlist.ticker == symbol)
-                ).first() is not None
-                
-                return exists
-                
-        except Exception as e:
-            logger.error(f"Error checking if {symbol} in watchlist for user {user_id}: {e}")
-            return False
+        cached = _watchlist_cache.get(f"{user_id}:tickers")
+        if cached is not None:
+            return symbol.upper() in cached
+        
+        with self._get_session() as db:
+            # SELECT EXISTS(...) returns one boolean instead of a hydrated row
+            return bool(db.scalar(select(exists().where(
+                and_(Watchlist.user_id == user_id, Watchlist.ticker == symbol.upper())
+            ))))
     
     # Scheduled Task Management - Unified API for all tasks
-    def create_scheduled_task(self, task_data: Dict[str, Any]) -> str:
+    def create_scheduled_task(self, task_data: Dict[str, Any], *, db: Optional[Session] = None) -> str:
         """Create a new scheduled task (immediate or scheduled execution)."""
         try:
-            with self._get_session() as db:
-                task_id = task_data.get("task_id") or f"task_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
-                
-                task = ScheduledTask(
-                    task_id=task_id,
-                    user_id=task_data.get("user_id", "demo_user"),
-                    ticker=task_data["ticker"],
-                    analysis_date=task_data.get("analysis_date"),
-                    analysts=task_data.get("analysts", []),
-                    research_depth=task_data.get("research_depth", 1),
-                    schedule_type=task_data.get("schedule_type", "immediate"),
-                    schedule_time=task_data.get("schedule_time"),
-                    schedule_date=task_data.get("schedule_date"),
-                    cron_expression=task_data.get("cron_expression"),
-                    timezone=task_data.get("timezone", "UTC"),
-                    status=task_data.get("status", "created"),
-                    enabled=task_data.get("enabled", True),
-                    progress=task_data.get("progress", 0),
-                    current_step=task_data.get("current_step"),
-                    result_data=task_data.get("result_data", {}),
-                    trace=task_data.get("trace", [])
+            with self._session_scope(db) as db:
+                task_id = task_data.get("task_id") or _generate_id("task")
+                
+                db.execute(
+                    insert(ScheduledTask).values(
+                        task_id=task_id,
+                        user_id=task_data.get("user_id", "demo_user"),
+                        ticker=task_data["ticker"],
+                        analysis_date=task_data.get("analysis_date"),
+                        analysts=task_data.get("analysts", _EMPTY_LIST),
+                        research_depth=task_data.get("research_depth", 1),
+                        schedule_type=task_data.get("schedule_type", "immediate"),
+                        schedule_time=task_data.get("schedule_time"),
+                        schedule_date=task_data.get("schedule_date"),
+                        cron_expression=task_data.get("cron_expression"),
+                        timezone=task_data.get("timezone", "UTC"),
+                        status=task_data.get("status", "created"),
+                        enabled=task_data.get("enabled", True),
+                        progress=task_data.get("progress", 0),
+                        current_step=task_data.get("current_step"),
+                        result_data=task_data.get("result_data", _EMPTY_DICT),
+                        trace=task_data.get("trace", _EMPTY_LIST)
+                    )
                 )
+                _commit(db)
                 
-                db.add(task)
-                db.commit()
-                db.refresh(task)
-                
-                logger.info(f"Created scheduled task: {task_id}")
+                logger.info("Created scheduled task: %s", task_id)
                 return task_id
                 
         except Exception as e:
             logger.error(f"Error creating scheduled task: {e}")
             raise
     
-    def get_scheduled_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+    @_db_op(default=None)
+    def get_scheduled_task(self, task_id: str, *, db: Optional[Session] = None) -> Optional[Dict[str, Any]]:
         """Get scheduled task by ID."""
-        try:
-            with self._get_session() as db:
-                task = db.query(ScheduledTask).filter(ScheduledTask.task_id == task_id).first()
-                
-                if not task:
-                    return None
-                
-                return {
+        with self._session_scope(db) as db:
+            task = db.execute(_GET_SCHEDULED_TASK_STMT, {"task_id": task_id}).scalar_one_or_none()
+            
+            if not task:
+                return None
+            
+            return {
+                "task_id": task.task_id,
+                "user_id": task.user_id,
+                "ticker": task.ticker,
+                "analysis_date": task.analysis_date,
+                "analysts": task.analysts,
+                "research_depth": task.research_depth,
+                "schedule_type": task.schedule_type,
+                "schedule_time": task.schedule_time,
+                "schedule_date": task.schedule_date,
+                "cron_expression": task.cron_expression,
+                "timezone": task.timezone,
+                "status": task.status,
+                "enabled": task.enabled,
+                "progress": task.progress,
+                "current_step": task.current_step,
+                "analysis_id": task.analysis_id,
+                "result_data": task.result_data,
+                "error_message": task.error_message,
+                "trace": task.trace,
+                "last_run": _iso(task.last_run),
+                "execution_count": task.execution_count,
+                "last_error": task.last_error,
+                "created_at": _iso(task.created_at),
+                "started_at": _iso(task.started_at),
+                "completed_at": _iso(task.completed_at),
+                "updated_at": _iso(task.updated_at)
+            }
+    
+    @_db_op(default=None)
+    def get_scheduled_task_fields(self, task_id: str, fields: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """Get only the given columns of a scheduled task (plus task_id); unknown names are ignored."""
+        # Sorted so each field set maps to one cached statement
+        names = sorted(_TASK_COLUMNS.intersection(fields) | {"task_id"})
+        columns = [ScheduledTask.__table__.c[name] for name in names]
+        
+        with self._get_session() as db:
+            row = db.execute(select(*columns).where(ScheduledTask.task_id == task_id)).first()
+            if row is None:
+                return None
+            
+            return {
+                name: _iso(value) if isinstance(value, datetime) else value
+                for name, value in zip(names, row)
+            }
+    
+    @_db_op(default=[])
+    def list_scheduled_tasks(self, user_id: str = None, status: str = None, schedule_type: str = None, limit: int = 50,
+                             schedule_types: Sequence[str] = None, ticker: str = None) -> List[Dict[str, Any]]:
+        """List scheduled tasks with optional filters; schedule_types matches any of several types."""
+        with self._get_session() as db:
+            query = db.query(ScheduledTask).options(raiseload("*"))
+            
+            if user_id:
+                query = query.filter(ScheduledTask.user_id == user_id)
+            if status:
+                query = query.filter(ScheduledTask.status == status)
+            if schedule_type:
+                query = query.filter(ScheduledTask.schedule_type == schedule_type)
+            if schedule_types:
+                query = query.filter(ScheduledTask.schedule_type.in_(schedule_types))
+            if ticker:
+                query = query.filter(ScheduledTask.ticker == ticker.upper())
+            
+            tasks = query.order_by(desc(ScheduledTask.created_at)).limit(limit).all()
+            
+            return [
+                {
                     "task_id": task.task_id,
                     "user_id": task.user_id,
                     "ticker": task.ticker,
@@ -934,112 +1475,68 @@ class DatabaseStorage:
                     "result_data": task.result_data,
                     "error_message": task.error_message,
                     "trace": task.trace,
-                    "last_run": task.last_run.isoformat() if task.last_run else None,
+                    "last_run": _iso(task.last_run),
                     "execution_count": task.execution_count,
                     "last_error": task.last_error,
-                    "created_at": task.created_at.isoformat() if task.created_at else None,
-                    "started_at": task.started_at.isoformat() if task.started_at else None,
-                    "completed_at": task.completed_at.isoformat() if task.completed_at else None,
-                    "updated_at": task.updated_at.isoformat() if task.updated_at else None
+                    "created_at": _iso(task.created_at),
+                    "started_at": _iso(task.started_at),
+                    "completed_at": _iso(task.completed_at),
+                    "updated_at": _iso(task.updated_at)
                 }
-        except Exception as e:
-            logger.error(f"Error getting task {task_id}: {e}")
-            return None
+                for task in tasks
+            ]
     
-    def list_scheduled_tasks(self, user_id: str = None, status: str = None, schedule_type: str = None, limit: int = 50) -> List[Dict[str, Any]]:
-        """List scheduled tasks with optional filters."""
+    def update_scheduled_task(self, task_id: str, updates: Dict[str, Any], *, db: Optional[Session] = None,
+                              exclude_immediate: bool = False) -> bool:
+        """Update scheduled task; False when no row matched (with exclude_immediate, immediate tasks don't match)."""
         try:
-            with self._get_session() as db:
-                query = db.query(ScheduledTask)
-                
-                if user_id:
-                    query = query.filter(ScheduledTask.user_id == user_id)
-                if status:
-                    query = query.filter(ScheduledTask.status == status)
-                if schedule_type:
-                    query = query.filter(ScheduledTask.schedule_type == schedule_type)
-                
-                tasks = query.order_by(desc(ScheduledTask.created_at)).limit(limit).all()
+            values = {}
+            for key, value in updates.items():
+                if key not in _TASK_COLUMNS:
+                    continue
+                if key in _TASK_DATETIME_COLUMNS and isinstance(value, str):
+                    value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+                values[key] = value
+            
+            with self._session_scope(db) as db:
+                # Single UPDATE; rowcount tells whether the task exists
+                stmt = update(ScheduledTask).where(ScheduledTask.task_id == task_id)
+                if exclude_immediate:
+                    stmt = stmt.where(ScheduledTask.schedule_type != "immediate")
+                if values:
+                    stmt = stmt.values(**values)
+                else:
+                    stmt = stmt.values(updated_at=func.now())
+                if db.execute(stmt).rowcount != 1:
+                    return False
                 
-                return [
-                    {
-                        "task_id": task.task_id,
-                        "user_id": task.user_id,
-                        "ticker": task.ticker,
-                        "analysis_date": task.analysis_date,
-                        "analysts": task.analysts,
-                        "research_depth": task.research_depth,
-                        "schedule_type": task.schedule_type,
-                        "schedule_time": task.schedule_time,
-                        "schedule_date": task.schedule_date,
-                        "cron_expression": task.cron_expression,
-                        "timezone": task.timezone,
-                        "status": task.status,
-                        "enabled": task.enabled,
-                        "progress": task.progress,
-                        "current_step": task.current_step,
-                        "analysis_id": task.analysis_id,
-                        "result_data": task.result_data,
-                        "error_message": task.error_message,
-                        "trace": task.trace,
-                        "last_run": task.last_run.isoformat() if task.last_run else None,
-                        "execution_count": task.execution_count,
-                        "last_error": task.last_error,
-                        "created_at": task.created_at.isoformat() if task.created_at else None,
-                        "started_at": task.started_at.isoformat() if task.started_at else None,
-                        "completed_at": task.completed_at.isoformat() if task.completed_at else None,
-                        "updated_at": task.updated_at.isoformat() if task.updated_at else None
-                    }
-                    for task in tasks
-                ]
-        except Exception as e:
-            logger.error(f"Error listing tasks: {e}")
-            return []
-    
-    def update_scheduled_task(self, task_id: str, updates: Dict[str, Any]) -> bool:
-        """Update scheduled task."""
-        try:
-            with self._get_session() as db:
-                task = db.query(ScheduledTask).filter(ScheduledTask.task_id == task_id).first()
+                _commit(db)
                 
-                if task:
-                    for key, value in updates.items():
-                        if hasattr(task, key):
-                            if key == "last_run" and isinstance(value, str):
-                                setattr(task, key, datetime.fromisoformat(value))
-                            elif key in ["started_at", "completed_at"] and isinstance(value, str):
-                                setattr(task, key, datetime.fromisoformat(value))
-                            else:
-                                setattr(task, key, value)
-                    
-                    db.commit()
-                    
-                    self.log_system_event("scheduled_task_updated", {
-                        "task_id": task_id,
-                        "updates": list(updates.keys()),
-                        "timestamp": self._get_timestamp()
-                    })
-                    return True
-                return False
+                self.log_system_event("scheduled_task_updated", {
+                    "task_id": task_id,
+                    "updates": list(updates.keys()),
+                    "timestamp": self._get_timestamp()
+                }, db=db if db.info.get(SHARED_TRANSACTION) else None)
+                return True
         except Exception as e:
             logger.error(f"Error updating scheduled task {task_id}: {e}")
             return False
     
-    def update_scheduled_task_status(self, task_id: str, status: str, **kwargs) -> bool:
+    def update_scheduled_task_status(self, task_id: str, status: str, *, db: Optional[Session] = None, **kwargs) -> bool:
         """Update scheduled task status and additional data."""
         try:
             updates = {"status": status}
             
             # Handle timestamp updates
             if status == "running" and "started_at" not in kwargs:
-                updates["started_at"] = datetime.now()
-            elif status in ["completed", "failed", "error"] and "completed_at" not in kwargs:
-                updates["completed_at"] = datetime.now()
+                updates["started_at"] = func.now()
+            elif status in _FINISHED_TASK_STATUSES and "completed_at" not in kwargs:
+                updates["completed_at"] = func.now()
             
             # Add any additional kwargs
             updates.update(kwargs)
             
-            return self.update_scheduled_task(task_id, updates)
+            return self.update_scheduled_task(task_id, updates, db=db)
         except Exception as e:
             logger.error(f"Error updating scheduled task status {task_id}: {e}")
             return False
@@ -1064,6 +1561,50 @@ class DatabaseStorage:
             logger.error(f"Error deleting scheduled task {task_id}: {e}")
             return False
     
+    def delete_completed_tasks(self, hours: int = 24) -> int:
+        """Delete completed tasks that finished more than `hours` ago; returns how many were removed."""
+        try:
+            with self._get_session() as db:
+                expired = and_(
+                    ScheduledTask.status == "completed",
+                    ScheduledTask.completed_at < _utc_ago(hours=hours)
+                )
+                task_ids = db.execute(select(ScheduledTask.task_id).where(expired)).scalars().all()
+                if not task_ids:
+                    return 0
+                db.execute(
+                    delete(ScheduledTask)
+                    .where(ScheduledTask.task_id.in_(task_ids))
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+            
+            for task_id in task_ids:
+                self.log_system_event("scheduled_task_deleted", {
+                    "task_id": task_id,
+                    "timestamp": self._get_timestamp()
+                })
+            logger.info("Deleted %s completed tasks older than %s hours", len(task_ids), hours)
+            return len(task_ids)
+        except Exception as e:
+            logger.error(f"Error deleting completed tasks: {e}")
+            return 0
+    
+    @_db_op(default=0)
+    def count_scheduled_tasks(self, user_id: str = None, status: str = None, schedule_type: str = None) -> int:
+        """Count scheduled tasks matching the filters without loading them."""
+        with self._get_session() as db:
+            query = select(func.count()).select_from(ScheduledTask)
+            
+            if user_id:
+                query = query.where(ScheduledTask.user_id == user_id)
+            if status:
+                query = query.where(ScheduledTask.status == status)
+            if schedule_type:
+                query = query.where(ScheduledTask.schedule_type == schedule_type)
+            
+            return db.scalar(query)
+    
     # Storage Statistics
     def get_storage_stats(self) -> Dict[str, Any]:
         """Get storage statistics."""
@@ -1089,8 +1630,13 @@ class DatabaseStorage:
                     "watchlist": Watchlist
                 }
                 
-                for table_name, model in tables.items():
-                    count = db.query(model).count()
+                # One round-trip: a scalar COUNT(*) subquery per table
+                counts = db.execute(select(*(
+                    select(func.count()).select_from(model).scalar_subquery().label(table_name)
+                    for table_name, model in tables.items()
+                ))).one()
+                
+                for table_name, count in counts._mapping.items():
                     stats["tables"][table_name] = {"record_count": count}
                 
                 return stats
@@ -1,11 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 import asyncio
 import json
 import logging
+import os
 import uvicorn
 from datetime import datetime
 from backend.database.storage_service import DatabaseStorage
+from backend.database.log_batcher import system_log_batcher
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -15,7 +18,8 @@ load_dotenv()
 from backend.routers import analysis, reports,system, notifications, stock_data
 from backend.services.scheduler_service import scheduler_service
 
-app = FastAPI(title="TradingAgents API", version="1.0.0")
+# orjson renders the large task/report/watchlist payloads much faster than json.dumps
+app = FastAPI(title="TradingAgents API", version="1.0.0", default_response_class=ORJSONResponse)
 
 # Configure CORS
 app.add_middleware(
@@ -46,10 +50,25 @@ async def startup_event():
         "version": "1.0.0"
     })
 
+    # Batch system log writes in the background when enabled
+    if os.getenv("SYSTEM_LOG_BATCHING", "").lower() in ("1", "true", "yes"):
+        system_log_batcher.start()
+
     # Start scheduler service
     scheduler_service.start()
+
+    # Build the OpenAPI document (and the deferred response-model schemas it pulls in) now,
+    # so the first /docs or /openapi.json request doesn't pay for it
+    if app.openapi_url:
+        app.openapi()
     logger.info("Application startup completed")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Application shutdown event handler"""
+    # Flush any queued system log events
+    system_log_batcher.stop()
+
 # Include routers
 app.include_router(analysis.router)
 app.include_router(reports.router)
@@ -1,21 +1,50 @@
 from fastapi import APIRouter, HTTPException, Request
-from pydantic import BaseModel
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import APIRoute
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional, Dict, Any
+import asyncio
 import logging
 from datetime import datetime
 
 from backend.services.analysis_services import analysis_service
 from backend.services.scheduler_service import scheduler_service
-from backend.database.storage_service import DatabaseStorage
+from backend.database.models import SCHEDULED_TASK_TYPES
+from backend.database.async_storage import AsyncDatabaseStorage
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+class AnalysisRoute(APIRoute):
+    """
+    Route class that maps errors for every analysis endpoint in one place:
+    ValueError becomes 400 and anything unexpected is logged and becomes 500,
+    so handlers only catch what needs a different status.
+    """
+    
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        
+        async def route_handler(request: Request):
+            try:
+                return await handler(request)
+            except (StarletteHTTPException, RequestValidationError):
+                raise
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            except Exception as e:
+                logger.error(f"Error handling {request.method} {request.url.path}: {e}")
+                raise HTTPException(status_code=500, detail=str(e))
+        
+        return route_handler
+
 # Initialize router
-router = APIRouter(prefix="/analysis", tags=["analysis"])
+router = APIRouter(prefix="/analysis", tags=["analysis"], route_class=AnalysisRoute)
 
-# Initialize storage
-storage = DatabaseStorage()
+# Initialize storage; database calls run in worker threads, off the event loop
+storage = AsyncDatabaseStorage()
 
 
 
@@ -33,7 +62,12 @@ class ScheduledAnalysisRequest(BaseModel):
     timezone: str = "UTC"
     enabled: bool = True
 
+# Response schemas below are documentation only (OpenAPI `responses=`); handlers return
+# plain dicts so FastAPI does not re-validate and re-serialize each payload. defer_build
+# leaves their core schemas unbuilt until /openapi.json is first generated
 class TaskResponse(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     task_id: str
     status: str
     message: str
@@ -41,6 +75,8 @@ class TaskResponse(BaseModel):
     schedule_id: Optional[str] = None
 
 class AnalysisResponse(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     analysis_id: str
     ticker: str
     status: str
@@ -49,6 +85,32 @@ class AnalysisResponse(BaseModel):
 
 # Helper functions - now delegated to services
 
+# Membership sets for per-task checks
+_SCHEDULED_TYPES = frozenset(SCHEDULED_TASK_TYPES)
+_ACTIVE_STATUSES = frozenset({"created", "starting", "running"})
+_FINISHED_STATUSES = frozenset({"completed", "failed", "error"})
+
+# Task fields copied as-is into the scheduled task response, in response order
+_SCHEDULED_TASK_FIELDS = (
+    "ticker", "analysts", "research_depth", "schedule_type", "schedule_time", "schedule_date",
+    "cron_expression", "timezone", "enabled", "created_at", "last_run"
+)
+
+# Columns _format_scheduled_task and get_task_details need whatever fields were requested
+_TASK_FORMAT_COLUMNS = frozenset({"task_id", "schedule_type", "enabled"})
+
+def _format_scheduled_task(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a stored scheduled task for the API."""
+    formatted = {
+        "task_id": task["task_id"],
+        "task_type": "scheduled",
+        "status": "enabled" if task["enabled"] else "disabled"
+    }
+    formatted.update({field: task.get(field) for field in _SCHEDULED_TASK_FIELDS})
+    formatted["execution_count"] = task.get("execution_count", 0)
+    formatted["last_error"] = task.get("last_error")
+    return formatted
+
 
 
 # API Endpoints - Scheduled tasks and analysis data
@@ -56,93 +118,54 @@ class AnalysisResponse(BaseModel):
 @router.get("/tasks")
 async def list_tasks():
     """Get list of all scheduled tasks (unified model)"""
-    try:
-        # Get all tasks from database storage
-        all_tasks = storage.list_scheduled_tasks(limit=100)
-        
-        # Separate tasks by type and status
-        scheduled_tasks = {}
-        active_tasks = {}
-        completed_tasks = {}
-        
-        for task in all_tasks:
-            task_id = task["task_id"]
-            
-            if task["schedule_type"] in ["once", "daily", "weekly", "monthly", "cron"]:
-                # These are scheduled tasks
-                scheduled_tasks[task_id] = {
-                    "task_id": task_id,
-                    "task_type": "scheduled",
-                    "status": "enabled" if task["enabled"] else "disabled",
-                    "ticker": task["ticker"],
-                    "analysts": task["analysts"],
-                    "research_depth": task["research_depth"],
-                    "schedule_type": task["schedule_type"],
-                    "schedule_time": task["schedule_time"],
-                    "schedule_date": task.get("schedule_date"),
-                    "cron_expression": task.get("cron_expression"),
-                    "timezone": task["timezone"],
-                    "enabled": task["enabled"],
-                    "created_at": task["created_at"],
-                    "last_run": task.get("last_run"),
-                    "execution_count": task.get("execution_count", 0),
-                    "last_error": task.get("last_error")
-                }
-            else:
-                # These are immediate execution tasks
-                if task["status"] in ["created", "starting", "running"]:
-                    active_tasks[task_id] = task
-                elif task["status"] in ["completed", "failed", "error"]:
-                    completed_tasks[task_id] = task
-        
-        return {
-            "scheduled_tasks": scheduled_tasks,
-            "active_tasks": active_tasks,
-            "completed_tasks": completed_tasks
-        }
-    except Exception as e:
-        logger.error(f"Error listing tasks: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    # Scheduled and immediate tasks are fetched separately so each gets the full limit
+    scheduled, immediate = await asyncio.gather(
+        storage.list_scheduled_tasks(limit=100, schedule_types=SCHEDULED_TASK_TYPES),
+        storage.list_scheduled_tasks(schedule_type="immediate", limit=100)
+    )
+    
+    # Build each group directly; the response keeps its task_id-keyed shape
+    scheduled_tasks = {task["task_id"]: _format_scheduled_task(task) for task in scheduled}
+    
+    # Immediate execution tasks, split by status
+    active_tasks = {
+        task["task_id"]: task for task in immediate
+        if task["status"] in _ACTIVE_STATUSES
+    }
+    completed_tasks = {
+        task["task_id"]: task for task in immediate
+        if task["status"] in _FINISHED_STATUSES
+    }
+    
+    # Storage rows hold only JSON-native values, so skip jsonable_encoder and render directly
+    return ORJSONResponse({
+        "scheduled_tasks": scheduled_tasks,
+        "active_tasks": active_tasks,
+        "completed_tasks": completed_tasks
+    })
 
 @router.get("/tasks/{task_id}")
-async def get_task_details(task_id: str):
-    """Get details of a specific scheduled task"""
-    try:
-        # Get task from database storage
-        task = storage.get_scheduled_task(task_id)
-        if not task:
-            raise HTTPException(status_code=404, detail="Task not found")
-        
-        # Format the task based on its type
-        if task["schedule_type"] in ["once", "daily", "weekly", "monthly", "cron"]:
-            # Scheduled task format
-            return {
-                "task_id": task_id,
-                "task_type": "scheduled",
-                "status": "enabled" if task["enabled"] else "disabled",
-                "ticker": task["ticker"],
-                "analysts": task["analysts"],
-                "research_depth": task["research_depth"],
-                "schedule_type": task["schedule_type"],
-                "schedule_time": task["schedule_time"],
-                "schedule_date": task.get("schedule_date"),
-                "cron_expression": task.get("cron_expression"),
-                "timezone": task["timezone"],
-                "enabled": task["enabled"],
-                "created_at": task["created_at"],
-                "last_run": task.get("last_run"),
-                "execution_count": task.get("execution_count", 0),
-                "last_error": task.get("last_error")
-            }
-        else:
-            # Immediate execution task format
-            return task
-            
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting task details for {task_id}: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+async def get_task_details(task_id: str, fields: Optional[str] = None):
+    """Get details of a specific scheduled task; `fields` is a comma-separated sparse fieldset"""
+    selected = frozenset(name.strip() for name in fields.split(",") if name.strip()) if fields else None
+    
+    # Get task from database storage, reading only the needed columns for a sparse fieldset
+    if selected:
+        task = await storage.get_scheduled_task_fields(task_id, selected | _TASK_FORMAT_COLUMNS)
+    else:
+        task = await storage.get_scheduled_task(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    # Format the task based on its type
+    if task["schedule_type"] in _SCHEDULED_TYPES:
+        # Scheduled task format
+        task = _format_scheduled_task(task)
+    # Otherwise immediate execution task format
+    
+    if selected:
+        return {name: value for name, value in task.items() if name in selected}
+    return task
 
 
 
@@ -151,121 +174,96 @@ async def delete_task(task_id: str):
     """Delete a scheduled task"""
     try:
         # Step 1: Remove from scheduler service
-        scheduler_service.delete_scheduled_task(task_id)
-        
-        # Step 2: Remove task data from analysis service
-        analysis_service.delete_scheduled_task(task_id)
-        
-        return {"message": "Scheduled task deleted successfully"}
-        
+        await asyncio.to_thread(scheduler_service.delete_scheduled_task, task_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
-    except Exception as e:
-        logger.error(f"Error deleting scheduled task: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    
+    # Step 2: Remove task data from analysis service
+    await asyncio.to_thread(analysis_service.delete_scheduled_task, task_id)
+    
+    return {"message": "Scheduled task deleted successfully"}
 
 @router.get("/config")
 async def get_analysis_config():
     """Get analysis configuration for creating new tasks"""
-    try:
-        user_id = "demo_user"  # Simplified without user management
-        return analysis_service.get_analysis_config(user_id)
-    except Exception as e:
-        logger.error(f"Error getting analysis config: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    user_id = "demo_user"  # Simplified without user management
+    return await asyncio.to_thread(analysis_service.get_analysis_config, user_id)
 
 @router.get("/history")
-async def get_analysis_history(ticker: str = None, limit: int = 50):
-    """Get analysis history"""
-    try:
-        user_id = "demo_user"  # Simplified without user management
-        return analysis_service.get_analysis_history(user_id, ticker, limit)
-    except Exception as e:
-        logger.error(f"Error getting analysis history: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+async def get_analysis_history(ticker: str = None, limit: int = 50, include_state: bool = True):
+    """Get analysis history; pass include_state=false for a lightweight listing"""
+    user_id = "demo_user"  # Simplified without user management
+    return await asyncio.to_thread(analysis_service.get_analysis_history, user_id, ticker, limit, include_state)
 
-@router.get("/{analysis_id}", response_model=AnalysisResponse)
+@router.get("/{analysis_id}", responses={200: {"model": AnalysisResponse}})
 async def get_analysis(analysis_id: str):
     """Get specific analysis"""
-    try:
-        user_id = "demo_user"  # Simplified without user management
-        analysis = analysis_service.get_analysis_by_id(analysis_id, user_id)
-        if not analysis:
-            raise HTTPException(status_code=404, detail="Analysis not found")
-        
-        return AnalysisResponse(
-            analysis_id=analysis["analysis_id"],
-            ticker=analysis["ticker"],
-            status=analysis["status"],
-            results=analysis.get("reports"),
-            created_at=analysis["created_at"]
-        )
-    except Exception as e:
-        logger.error(f"Error getting analysis: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    user_id = "demo_user"  # Simplified without user management
+    # The response carries none of final_state, so don't load it
+    analysis = await asyncio.to_thread(analysis_service.get_analysis_by_id, analysis_id, user_id, False)
+    if not analysis:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    
+    return ORJSONResponse({
+        "analysis_id": analysis["analysis_id"],
+        "ticker": analysis["ticker"],
+        "status": analysis["status"],
+        "results": analysis.get("reports"),
+        "created_at": analysis["created_at"]
+    })
 
 # Scheduled Tasks API Endpoints
 
-@router.post("/tasks", response_model=TaskResponse)
+@router.post("/tasks", responses={200: {"model": TaskResponse}})
 async def create_scheduled_analysis(request: ScheduledAnalysisRequest, http_request: Request):
     """Create a scheduled analysis task"""
-    try:
-        # Extract language preference from headers
-        accept_language = http_request.headers.get("Accept-Language", "en-US")
-        
-        # Step 1: Create task data in analysis service first
-        task_data = analysis_service.create_scheduled_task(
-            ticker=request.ticker,
-            analysts=request.analysts,
-            research_depth=request.research_depth,
-            schedule_type=request.schedule_type,
-            schedule_time=request.schedule_time,
-            timezone=request.timezone,
-            schedule_date=request.schedule_date,
-            cron_expression=request.cron_expression,
-            enabled=request.enabled,
-            user_id="demo_user",
-            language=accept_language
-        )
-        
+    # Extract language preference from headers
+    accept_language = http_request.headers.get("Accept-Language", "en-US")
+    
+    # Insert as "scheduled" in one transaction, then register with the scheduler only once
+    # the row is committed, so a job never runs (or survives a rollback) without its row
+    def create_and_schedule() -> str:
+        with storage.sync.transaction() as db:
+            # Step 1: Create task data in analysis service first
+            task_data = analysis_service.create_scheduled_task(
+                ticker=request.ticker,
+                analysts=request.analysts,
+                research_depth=request.research_depth,
+                schedule_type=request.schedule_type,
+                schedule_time=request.schedule_time,
+                timezone=request.timezone,
+                schedule_date=request.schedule_date,
+                cron_expression=request.cron_expression,
+                enabled=request.enabled,
+                user_id="demo_user",
+                language=accept_language,
+                initial_status="scheduled",
+                db=db
+            )
+            
         schedule_id = task_data["task_id"]
         
-        # Step 2: Add the task to scheduler service
+        # Step 2: Add the committed task to scheduler service
         try:
-            scheduler_success = scheduler_service.add_task_to_scheduler(task_data)
-            if scheduler_success:
-                # Update task status to scheduled
-                analysis_service.update_scheduled_task_status(schedule_id, "scheduled")
-            else:
-                # If scheduler failed, update status to error
-                analysis_service.update_scheduled_task_status(schedule_id, "error", 
-                                                            error="Failed to add to scheduler")
+            if not scheduler_service.add_task_to_scheduler(task_data):
                 raise Exception("Failed to add task to scheduler")
-                
         except Exception as scheduler_error:
-            # If scheduler fails, we still have the task data but it won't be executed
+            # The row is already committed; mark it so it isn't mistaken for a live schedule
             logger.error(f"Failed to add task to scheduler: {scheduler_error}")
-            analysis_service.update_scheduled_task_status(schedule_id, "error", 
-                                                        error=str(scheduler_error))
+            analysis_service.update_scheduled_task_status(schedule_id, "error", error=str(scheduler_error))
             raise HTTPException(status_code=500, 
                               detail=f"Task created but scheduling failed: {str(scheduler_error)}")
-        
-        return TaskResponse(
-            task_id=schedule_id,
-            status="scheduled",
-            message="Scheduled analysis task created and scheduled successfully",
-            task_type="scheduled",
-            schedule_id=schedule_id
-        )
-        
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except HTTPException:
-        # Re-raise HTTP exceptions as-is
-        raise
-    except Exception as e:
-        logger.error(f"Error creating scheduled analysis: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        return schedule_id
+    
+    schedule_id = await asyncio.to_thread(create_and_schedule)
+    
+    return {
+        "task_id": schedule_id,
+        "status": "scheduled",
+        "message": "Scheduled analysis task created and scheduled successfully",
+        "task_type": "scheduled",
+        "schedule_id": schedule_id
+    }
 
 
 
@@ -276,110 +274,81 @@ async def toggle_task(task_id: str):
     """Enable or disable a scheduled task"""
     try:
         # Step 1: Toggle in scheduler service
-        result = scheduler_service.toggle_task(task_id)
-        
-        # Step 2: Update status in analysis service  
-        new_status = "scheduled" if result["enabled"] else "disabled"
-        analysis_service.update_scheduled_task_status(task_id, new_status, enabled=result["enabled"])
-        
-        return result
-        
+        result = await asyncio.to_thread(scheduler_service.toggle_task, task_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
-    except Exception as e:
-        logger.error(f"Error toggling scheduled task: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    
+    # Step 2: Update status in analysis service  
+    new_status = "scheduled" if result["enabled"] else "disabled"
+    await asyncio.to_thread(
+        analysis_service.update_scheduled_task_status, task_id, new_status, enabled=result["enabled"]
+    )
+    
+    return result
 
 
 
 @router.put("/tasks/{task_id}")
 async def update_task(task_id: str, request: ScheduledAnalysisRequest):
     """Update a scheduled task"""
+    # Prepare update data
+    update_data = {
+        "ticker": request.ticker,
+        "analysts": request.analysts,
+        "research_depth": request.research_depth,
+        "schedule_type": request.schedule_type,
+        "schedule_time": request.schedule_time,
+        "schedule_date": request.schedule_date,
+        "cron_expression": request.cron_expression,
+        "timezone": request.timezone,
+        "enabled": request.enabled,
+        "status": "scheduled"
+    }
+    
+    # One conditional UPDATE (WHERE schedule_type != 'immediate') persists the configuration
+    # and status; the scheduler then re-registers the job
     try:
-        # Get existing task to validate it exists
-        existing_task = storage.get_scheduled_task(task_id)
+        await asyncio.to_thread(scheduler_service.update_scheduled_task, task_id, update_data)
+    except ValueError:
+        # No row matched; only now look the task up to tell missing from immediate
+        existing_task = await storage.get_scheduled_task(task_id)
         if not existing_task:
             raise HTTPException(status_code=404, detail="Task not found")
-        
-        # Validate that it's a scheduled task (not immediate)
         if existing_task.get("schedule_type") == "immediate":
             raise HTTPException(status_code=400, detail="Cannot edit immediate execution tasks")
-        
-        # Prepare update data
-        update_data = {
-            "ticker": request.ticker,
-            "analysts": request.analysts,
-            "research_depth": request.research_depth,
-            "schedule_type": request.schedule_type,
-            "schedule_time": request.schedule_time,
-            "schedule_date": request.schedule_date,
-            "cron_expression": request.cron_expression,
-            "timezone": request.timezone,
-            "enabled": request.enabled
-        }
-        
-        # Update in scheduler service (this will handle re-registering the job)
-        scheduler_service.update_scheduled_task(task_id, update_data)
-        
-        # Update in analysis service 
-        analysis_service.update_scheduled_task_status(task_id, "scheduled", **update_data)
-        
-        return {
-            "message": "Task updated successfully",
-            "task_id": task_id
-        }
-        
-    except HTTPException:
-        raise
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        logger.error(f"Error updating scheduled task: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail="Failed to update task")
+    
+    return {
+        "message": "Task updated successfully",
+        "task_id": task_id
+    }
 
 
 @router.post("/tasks/{task_id}/run-now")
 async def run_task_now(task_id: str):
     """Execute a scheduled task immediately"""
-    task_info = scheduler_service.get_scheduled_task(task_id)
+    # Read the scheduler's in-memory entry directly; only three fields are needed, no copy
+    task_info = scheduler_service.scheduled_tasks.get(task_id)
     if not task_info:
         raise HTTPException(status_code=404, detail="Scheduled task not found")
     
-    try:
-        # Execute immediately using scheduler service
-        analysis_config = {
-            "ticker": task_info["ticker"],
-            "analysts": task_info["analysts"],
-            "research_depth": task_info["research_depth"]
-        }
-        
-        # Execute the analysis using unified task executor
-        execution_id = await scheduler_service.execute_analysis_task(
-            ticker=analysis_config["ticker"],
-            analysts=analysis_config["analysts"],
-            research_depth=analysis_config["research_depth"],
-            schedule_id=task_id
-        )
-        
-        return {
-            "message": f"Scheduled task '{task_id}' started successfully",
-            "task_id": task_id,
-            "ticker": task_info["ticker"],
-            "status": "started"
-        }
-        
-    except Exception as e:
-        logger.error(f"Error running scheduled task now: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    # Execute the analysis using unified task executor, straight from the loaded task
+    await scheduler_service.execute_analysis_task(
+        ticker=task_info["ticker"],
+        analysts=task_info["analysts"],
+        research_depth=task_info["research_depth"],
+        schedule_id=task_id
+    )
+    
+    return {
+        "message": f"Scheduled task '{task_id}' started successfully",
+        "task_id": task_id,
+        "ticker": task_info["ticker"],
+        "status": "started"
+    }
 
 
 @router.get("/scheduler/status")
 async def get_scheduler_status():
     """Get scheduler service status and statistics"""
-    try:
-        return scheduler_service.get_scheduler_status()
-    except Exception as e:
-        logger.error(f"Error getting scheduler status: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-
+    return scheduler_service.get_scheduler_status()
@@ -1,10 +1,13 @@
 from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, List, Dict, Any
 from datetime import datetime
+import asyncio
 import logging
+import time
 
-from backend.storage import LocalStorage
+from backend.storage import get_local_storage
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 logger = logging.getLogger(__name__)
@@ -18,6 +21,9 @@ class NotificationCreate(BaseModel):
     metadata: Optional[Dict[str, Any]] = None
 
 class NotificationResponse(BaseModel):
+    # Documentation-only schema (see get_notifications); built lazily for /openapi.json
+    model_config = ConfigDict(defer_build=True)
+    
     id: str
     user_id: str
     title: str
@@ -28,9 +34,26 @@ class NotificationResponse(BaseModel):
     metadata: Optional[Dict[str, Any]] = None
 
 # Initialize storage
-storage = LocalStorage()
+storage = get_local_storage()
 
-@router.get("/", response_model=List[NotificationResponse])
+# Stats are polled by dashboards but needn't be real-time; let the browser reuse them briefly
+_STATS_HEADERS = {"Cache-Control": "private, max-age=10"}
+
+# (epoch second, ISO string) of the last stats timestamp; requests within a second share it
+_stats_ts = (0, "")
+
+
+def _stats_timestamp() -> str:
+    """Second-resolution ISO timestamp, formatted once per second."""
+    global _stats_ts
+    now = int(time.time())
+    if now != _stats_ts[0]:
+        _stats_ts = (now, datetime.fromtimestamp(now).isoformat())
+    return _stats_ts[1]
+
+# The schema is documentation only; rows come from our own store and are shaped here
+# without per-row model validation
+@router.get("/", responses={200: {"model": List[NotificationResponse]}})
 async def get_notifications(
     user_id: str = Query("demo_user", description="User ID to get notifications for"),
     unread_only: bool = Query(False, description="Only return unread notifications"),
@@ -38,24 +61,39 @@ async def get_notifications(
 ):
     """Get user notifications"""
     try:
-        notifications = storage.get_notifications(user_id, unread_only, limit)
-        return notifications
+        notifications = await asyncio.to_thread(storage.get_notifications, user_id, unread_only, limit)
+        return ORJSONResponse([
+            {
+                "id": notification["notification_id"],
+                "user_id": notification["user_id"],
+                "title": notification["title"],
+                "message": notification["message"],
+                "type": notification["type"],
+                "read": notification["read"],
+                "created_at": notification["created_at"],
+                "metadata": notification["data"]
+            }
+            for notification in notifications
+        ])
     except Exception as e:
         logger.error(f"Error getting notifications: {e}")
         raise HTTPException(status_code=500, detail="Failed to get notifications")
 
-@router.post("/", response_model=Dict[str, str])
+@router.post("/", responses={200: {"model": Dict[str, Optional[str]]}})
 async def create_notification(notification: NotificationCreate):
     """Create a new notification"""
     try:
-        notification_id = storage.save_notification(
-            user_id=notification.user_id,
-            title=notification.title,
-            message=notification.message,
-            notification_type=notification.type,
-            metadata=notification.metadata or {}
-        )
-        return {"id": notification_id, "message": "Notification created successfully"}
+        created = await asyncio.to_thread(storage.create_notification, notification.user_id, {
+            "title": notification.title,
+            "message": notification.message,
+            "type": notification.type,
+            "data": notification.metadata or {}
+        })
+        return ORJSONResponse({
+            "id": created["notification_id"],
+            "created_at": created["created_at"],
+            "message": "Notification created successfully"
+        })
     except Exception as e:
         logger.error(f"Error creating notification: {e}")
         raise HTTPException(status_code=500, detail="Failed to create notification")
@@ -67,7 +105,7 @@ async def mark_notification_read(
 ):
     """Mark a notification as read"""
     try:
-        success = storage.mark_notification_read(user_id, notification_id)
+        success = await asyncio.to_thread(storage.mark_notification_read, user_id, notification_id)
         if not success:
             raise HTTPException(status_code=404, detail="Notification not found")
         return {"message": "Notification marked as read"}
@@ -77,21 +115,32 @@ async def mark_notification_read(
         logger.error(f"Error marking notification as read: {e}")
         raise HTTPException(status_code=500, detail="Failed to mark notification as read")
 
+@router.put("/read-all")
+async def mark_all_notifications_read(
+    user_id: str = Query("demo_user", description="User ID who owns the notifications")
+):
+    """Mark all notifications as read"""
+    try:
+        updated = await asyncio.to_thread(storage.mark_all_notifications_read, user_id)
+        return {"message": "All notifications marked as read", "updated": updated}
+    except Exception as e:
+        logger.error(f"Error marking all notifications as read: {e}")
+        raise HTTPException(status_code=500, detail="Failed to mark all notifications as read")
+
 @router.get("/stats")
 async def get_notification_stats(
     user_id: str = Query("demo_user", description="User ID to get stats for")
 ):
     """Get notification statistics for a user"""
     try:
-        all_notifications = storage.get_notifications(user_id, unread_only=False, limit=1000)
-        unread_notifications = storage.get_notifications(user_id, unread_only=True, limit=1000)
+        counts = await asyncio.to_thread(storage.get_notification_counts, user_id)
         
-        return {
-            "total": len(all_notifications),
-            "unread": len(unread_notifications),
-            "read": len(all_notifications) - len(unread_notifications),
-            "timestamp": datetime.now().isoformat()
-        }
+        return ORJSONResponse({
+            "total": counts["total"],
+            "unread": counts["unread"],
+            "read": counts["total"] - counts["unread"],
+            "timestamp": _stats_timestamp()
+        }, headers=_STATS_HEADERS)
     except Exception as e:
         logger.error(f"Error getting notification stats: {e}")
         raise HTTPException(status_code=500, detail="Failed to get notification stats")
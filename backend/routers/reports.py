@@ -1,7 +1,11 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict
 from typing import Dict, Any, List
+import asyncio
+import hashlib
 import logging
+import orjson
 from pathlib import Path
 
 from backend.services.reports_service import reports_service
@@ -12,8 +16,17 @@ logger = logging.getLogger(__name__)
 # Initialize router
 router = APIRouter(prefix="/reports", tags=["reports"])
 
+# Statistics are polled by dashboards but needn't be real-time; let the browser reuse them briefly
+_STATS_HEADERS = {"Cache-Control": "private, max-age=10"}
+
+# Upper bound on report_ids per batch delete request
+MAX_BATCH_DELETE = 500
+
 # Pydantic models
 class ReportResponse(BaseModel):
+    # Schema only, never instantiated; skip building its validator at import
+    model_config = ConfigDict(defer_build=True)
+    
     ticker: str
     date: str
     reports: Dict[str, Any]
@@ -24,35 +37,62 @@ class BatchDeleteRequest(BaseModel):
 class BatchDeleteReportsRequest(BaseModel):
     report_ids: List[str]
 
+def _report_etag(report: Dict[str, Any]) -> str:
+    """Strong ETag over the report's content; updated_at alone has one-second resolution on SQLite."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{report['report_id']}:{report['updated_at']}:{report['title']}".encode())
+    digest.update(orjson.dumps(report["sections"], option=orjson.OPT_SORT_KEYS))
+    return f'"{digest.hexdigest()}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match check: a comma-separated tag list or "*", compared weakly (W/ ignored)."""
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
 # API Endpoints
 @router.get("")
-async def list_reports(watchlist_only: bool = False, ticker: str = None, user_id: str = "demo_user"):
+async def list_reports(watchlist_only: bool = False, ticker: str = None, user_id: str = "demo_user",
+                       include_sections: bool = True):
     """Get list of available reports, optionally filtered by watchlist or ticker"""
     try:
         # Use reports service to get reports with enhanced data
-        reports = reports_service.list_reports(
+        reports = await asyncio.to_thread(
+            reports_service.list_reports,
             user_id=user_id,
             ticker=ticker,
             watchlist_only=watchlist_only,
-            limit=100
+            limit=100,
+            include_sections=include_sections
         )
         
-        return reports
+        # Report dicts hold only JSON-native values; render directly without jsonable_encoder
+        return ORJSONResponse(reports)
     except Exception as e:
         logger.error(f"Error listing reports: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/report/{report_id}")
-async def get_report_by_id(report_id: str, user_id: str = "demo_user"):
-    """Get specific report content by report ID"""
+async def get_report_by_id(report_id: str, request: Request, user_id: str = "demo_user"):
+    """Get specific report content by report ID; honours If-None-Match with 304 Not Modified"""
     try:
         # Use reports service to get enhanced report data
-        report = reports_service.get_report_by_id(report_id, user_id)
+        report = await asyncio.to_thread(reports_service.get_report_by_id, report_id, user_id)
         
         if not report:
             raise HTTPException(status_code=404, detail="Report not found")
         
-        return report
+        etag = _report_etag(report)
+        if _etag_matches(request.headers.get("if-none-match", ""), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        return ORJSONResponse(report, headers={"ETag": etag})
     except HTTPException:
         raise
     except Exception as e:
@@ -64,13 +104,14 @@ async def get_reports_by_ticker(ticker: str, limit: int = 50, user_id: str = "de
     """Get all reports for a specific ticker symbol"""
     try:
         # Use reports service to get enhanced reports for ticker
-        reports = reports_service.get_reports_by_ticker(
+        reports = await asyncio.to_thread(
+            reports_service.get_reports_by_ticker,
             ticker=ticker,
             user_id=user_id,
             limit=limit
         )
         
-        return reports
+        return ORJSONResponse(reports)
     except Exception as e:
         logger.error(f"Error getting reports for ticker {ticker}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -81,7 +122,7 @@ async def delete_report(report_id: str, user_id: str = "demo_user"):
     """Delete a specific report by ID"""
     try:
         # Use reports service to delete report
-        result = reports_service.delete_report(report_id, user_id)
+        result = await asyncio.to_thread(reports_service.delete_report, report_id, user_id)
         
         if not result["success"]:
             if "not found" in result.get("error", "").lower():
@@ -100,8 +141,11 @@ async def delete_report(report_id: str, user_id: str = "demo_user"):
 async def delete_multiple_reports(request: BatchDeleteReportsRequest, user_id: str = "demo_user"):
     """Delete multiple reports by report IDs"""
     try:
+        if len(request.report_ids) > MAX_BATCH_DELETE:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_DELETE} reports can be deleted per request")
+        
         # Use reports service for batch deletion
-        result = reports_service.batch_delete_reports(request.report_ids, user_id)
+        result = await asyncio.to_thread(reports_service.batch_delete_reports, request.report_ids, user_id)
         
         if not result["success"]:
             raise HTTPException(status_code=500, detail=result.get("error", "Batch deletion failed"))
@@ -120,8 +164,11 @@ async def delete_multiple_reports(request: BatchDeleteReportsRequest, user_id: s
 async def get_report_statistics(user_id: str = "demo_user"):
     """Get comprehensive report statistics for the user"""
     try:
-        statistics = reports_service.get_report_statistics(user_id)
-        return statistics
+        statistics = await asyncio.to_thread(reports_service.get_report_statistics, user_id)
+        # The service reports failures in-band; only successful results are cacheable
+        if "error" in statistics:
+            return statistics
+        return ORJSONResponse(statistics, headers=_STATS_HEADERS)
     except Exception as e:
         logger.error(f"Error getting report statistics: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -136,8 +183,8 @@ async def get_recent_reports(days: int = 7, limit: int = 20, user_id: str = "dem
         if limit <= 0 or limit > 100:
             raise HTTPException(status_code=400, detail="Limit must be between 1 and 100")
             
-        recent_reports = reports_service.get_recent_reports(user_id, days, limit)
-        return recent_reports
+        recent_reports = await asyncio.to_thread(reports_service.get_recent_reports, user_id, days, limit)
+        return ORJSONResponse(recent_reports)
     except HTTPException:
         raise
     except Exception as e:
@@ -160,7 +207,8 @@ async def create_report(request: CreateReportRequest, user_id: str = "demo_user"
       
         
         # Create the report
-        report_id = reports_service.create_unified_report(
+        report_id = await asyncio.to_thread(
+            reports_service.create_unified_report,
             analysis_id=request.analysis_id,
             user_id=user_id,
             ticker=request.ticker,
@@ -169,7 +217,7 @@ async def create_report(request: CreateReportRequest, user_id: str = "demo_user"
         )
         
         # Get the created report
-        created_report = reports_service.get_report_by_id(report_id, user_id)
+        created_report = await asyncio.to_thread(reports_service.get_report_by_id, report_id, user_id)
         
         return {
             "success": True,
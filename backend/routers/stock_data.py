@@ -10,7 +10,7 @@ from datetime import datetime
 from pydantic import BaseModel
 
 from backend.services.data_services import DataServices
-from backend.storage import LocalStorage
+from backend.storage import get_local_storage
 
 # 配置日志
 logger = logging.getLogger(__name__)
@@ -18,7 +18,7 @@ logger = logging.getLogger(__name__)
 # 初始化路由器和数据服务
 router = APIRouter(prefix="/api/stock", tags=["stock-data"])
 data_service = DataServices(require_api_key=False)  # 仅使用缓存数据
-storage = LocalStorage()  # 本地存储服务
+storage = get_local_storage()  # 本地存储服务
 
 # Pydantic 模型
 class StockDataRequest(BaseModel):
@@ -85,20 +85,22 @@ async def get_stock_data(
 ):
     """获取指定窗口期的股票数据"""
     try:
+        symbol = symbol.upper()
+        
         # 验证日期格式
         if not data_service.validate_date(curr_date):
             raise HTTPException(status_code=400, detail="日期格式无效，请使用 YYYY-MM-DD 格式")
         
-        data = data_service.get_stock_data_window(symbol.upper(), curr_date, look_back_days)
+        data = data_service.get_stock_data_window(symbol, curr_date, look_back_days)
         
         if data.empty:
-            raise HTTPException(status_code=404, detail=f"未找到股票 {symbol.upper()} 的数据")
+            raise HTTPException(status_code=404, detail=f"未找到股票 {symbol} 的数据")
         
         # 转换 DataFrame 为 JSON 格式
         data_dict = data.reset_index().to_dict('records')
         
         return {
-            "symbol": symbol.upper(),
+            "symbol": symbol,
             "period": f"{look_back_days} days",
             "data": data_dict,
             "count": len(data_dict),
@@ -142,6 +144,8 @@ async def get_technical_indicator(
 ):
     """计算单个技术指标"""
     try:
+        symbol = symbol.upper()
+        
         if not data_service.validate_date(curr_date):
             raise HTTPException(status_code=400, detail="日期格式无效，请使用 YYYY-MM-DD 格式")
         
@@ -154,17 +158,17 @@ async def get_technical_indicator(
             )
         
         result = data_service.calculate_technical_indicator(
-            symbol.upper(), indicator, curr_date, look_back_days
+            symbol, indicator, curr_date, look_back_days
         )
         
         if result.empty:
-            raise HTTPException(status_code=404, detail=f"无法计算指标 {indicator} for {symbol.upper()}")
+            raise HTTPException(status_code=404, detail=f"无法计算指标 {indicator} for {symbol}")
         
         # 转换 DataFrame 为 JSON 格式
         data_dict = result.reset_index().to_dict('records')
         
         return {
-            "symbol": symbol.upper(),
+            "symbol": symbol,
             "indicator": indicator,
             "description": supported_indicators[indicator],
             "period": f"{look_back_days} days",
@@ -194,8 +198,9 @@ async def get_multiple_indicators(request: MultipleIndicatorsRequest):
                 detail=f"不支持的指标: {invalid_indicators}。支持的指标: {list(supported_indicators.keys())}"
             )
         
+        symbol = request.symbol.upper()
         results = data_service.get_multiple_indicators(
-            request.symbol.upper(),
+            symbol,
             request.indicators,
             request.curr_date,
             request.look_back_days
@@ -217,7 +222,7 @@ async def get_multiple_indicators(request: MultipleIndicatorsRequest):
                 }
         
         return {
-            "symbol": request.symbol.upper(),
+            "symbol": symbol,
             "indicators": formatted_results,
             "period": f"{request.look_back_days} days",
             "generated_at": datetime.now().isoformat()
@@ -1,18 +1,35 @@
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator, List
 import logging
 import os
+import orjson
 from datetime import datetime
 
-from backend.database.storage_service import DatabaseStorage
+from backend.database.async_storage import AsyncDatabaseStorage
+from backend.services.analysis_services import analysis_service
+from backend.services.analysis_runner_service import normalize_language
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 # Initialize router and storage
 router = APIRouter(prefix="/system", tags=["system"])
-storage = DatabaseStorage()
+storage = AsyncDatabaseStorage()
+
+# Log entries serialized per streamed chunk
+_LOG_CHUNK_SIZE = 256
+
+
+def _stream_logs(logs: List[Dict[str, Any]]) -> Iterator[bytes]:
+    """Yield {"logs": [...]} in chunks so the full JSON body is never held in memory at once."""
+    yield b'{"logs":['
+    for start in range(0, len(logs), _LOG_CHUNK_SIZE):
+        # orjson has no streaming encoder; strip the brackets off each batch's array
+        chunk = orjson.dumps(logs[start:start + _LOG_CHUNK_SIZE])[1:-1]
+        yield chunk if start == 0 else b"," + chunk
+    yield b"]}"
 
 # Pydantic models for user preferences (not API keys)
 class UserPreferencesRequest(BaseModel):
@@ -31,7 +48,7 @@ class UserPreferencesRequest(BaseModel):
 async def get_config():
     """Get current system configuration and status"""
     # Get user preferences from storage
-    user_config = storage.get_user_config("demo_user")
+    user_config = await storage.get_user_config("demo_user")
     
     # Return system status and configuration (without sensitive API keys)
     config = {
@@ -84,19 +101,17 @@ async def update_user_preferences(preferences: UserPreferencesRequest, request:
         if not preferences.default_language and not preferences.report_language:
             accept_language = request.headers.get("Accept-Language")
             if accept_language:
-                # Import the language normalization function
-                from backend.services.analysis_runner_service import AnalysisRunnerService
-                runner_service = AnalysisRunnerService()
-                normalized_language = runner_service._normalize_language(accept_language)
+                normalized_language = normalize_language(accept_language)
                 pref_updates["default_language"] = normalized_language
                 pref_updates["report_language"] = normalized_language
-                logger.info(f"Auto-detected language from browser: {accept_language} -> {normalized_language}")
+                logger.info("Auto-detected language from browser: %s -> %s", accept_language, normalized_language)
             
         # Save preferences to storage
-        storage.save_user_config("demo_user", pref_updates)
+        await storage.save_user_config("demo_user", pref_updates)
+        analysis_service.invalidate_config("demo_user")
         
         # Log system event
-        storage.log_system_event("preferences_updated", {
+        await storage.log_system_event("preferences_updated", {
             "updated_preferences": list(pref_updates.keys())
         })
             
@@ -153,15 +168,15 @@ async def get_available_models():
 async def get_system_stats():
     """Get system statistics"""
     try:
-        stats = storage.get_storage_stats()
+        stats = await storage.get_storage_stats()
         
         # Add runtime stats by querying database
-        active_tasks = storage.list_scheduled_tasks(status="running", limit=1000)
-        completed_tasks = storage.list_scheduled_tasks(status="completed", limit=1000)
+        active_tasks = await storage.count_scheduled_tasks(status="running")
+        completed_tasks = await storage.count_scheduled_tasks(status="completed")
         
         stats["runtime"] = {
-            "active_tasks": len(active_tasks),
-            "completed_tasks": len(completed_tasks),
+            "active_tasks": active_tasks,
+            "completed_tasks": completed_tasks,
             "timestamp": datetime.now().isoformat()
         }
         
@@ -172,39 +187,53 @@ async def get_system_stats():
 
 @router.get("/logs")
 async def get_system_logs(date: str = None, event_type: str = None):
-    """Get system logs"""
+    """Get system logs, streamed since an unfiltered log can hold many thousands of events"""
     try:
-        logs = storage.get_system_logs(date, event_type)
-        return {"logs": logs}
+        logs = await storage.get_system_logs(date, event_type)
+        return StreamingResponse(_stream_logs(logs), media_type="application/json")
     except Exception as e:
         logger.error(f"Error getting system logs: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/logs/event-types")
+async def get_system_log_event_types():
+    """Get distinct system event types"""
+    try:
+        return {"event_types": await storage.get_event_types()}
+    except Exception as e:
+        logger.error(f"Error getting system event types: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/logs/stats")
+async def get_system_log_stats(days: int = 7):
+    """Get system event counts by type"""
+    try:
+        return await storage.get_event_statistics(days)
+    except Exception as e:
+        logger.error(f"Error getting system log stats: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/cleanup")
 async def cleanup_system():
     """Cleanup expired cache and old logs"""
     try:
-        storage.clear_expired_cache()
+        await storage.clear_expired_cache()
         
-        # Clean up old completed tasks (older than 24 hours)
-        from datetime import timedelta
-        cutoff_time = datetime.now() - timedelta(hours=24)
+        # Clean up read notifications older than 30 days
+        old_notifications_count = await storage.delete_old_notifications(days=30)
         
-        # Get old completed tasks
-        old_tasks = storage.list_scheduled_tasks(status="completed", limit=1000)
-        expired_tasks_count = 0
+        # Clean up system logs older than 30 days
+        old_logs_count = await storage.cleanup_old_logs(days=30)
         
-        for task in old_tasks:
-            if task.get("completed_at"):
-                from datetime import datetime
-                completed_at = datetime.fromisoformat(task["completed_at"].replace('Z', '+00:00'))
-                if completed_at < cutoff_time:
-                    storage.delete_scheduled_task(task["task_id"])
-                    expired_tasks_count += 1
+        # Clean up old completed tasks (older than 24 hours); the cutoff is applied in SQL
+        # against the database clock that stamps completed_at
+        expired_tasks_count = await storage.delete_completed_tasks(hours=24)
         
         return {
             "message": "System cleanup completed",
-            "expired_tasks_removed": expired_tasks_count
+            "expired_tasks_removed": expired_tasks_count,
+            "old_notifications_removed": old_notifications_count,
+            "old_logs_removed": old_logs_count
         }
     except Exception as e:
         logger.error(f"Error during system cleanup: {e}")
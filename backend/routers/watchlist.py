@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Dict, Any, List, Optional
 import logging
 
@@ -30,6 +31,9 @@ class BulkWatchlistRequest(BaseModel):
     tickers: List[str] = Field(..., description="List of ticker symbols")
 
 class WatchlistResponse(BaseModel):
+    # Documentation-only schema (see get_watchlist_detailed); built lazily for /openapi.json
+    model_config = ConfigDict(defer_build=True)
+    
     id: str
     ticker: str
     added_date: Optional[str]
@@ -40,22 +44,23 @@ class WatchlistResponse(BaseModel):
     updated_at: Optional[str]
 
 # API Endpoints
-@router.get("", response_model=List[str])
+@router.get("", responses={200: {"model": List[str]}})
 async def get_watchlist(user_id: str = "demo_user"):
     """Get user's watchlist ticker symbols"""
     try:
         watchlist = storage.get_user_watchlist(user_id)
-        return watchlist
+        return ORJSONResponse(watchlist)
     except Exception as e:
         logger.error(f"Error getting watchlist for user {user_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/detailed", response_model=List[WatchlistResponse])
+@router.get("/detailed", responses={200: {"model": List[WatchlistResponse]}})
 async def get_watchlist_detailed(user_id: str = "demo_user"):
     """Get user's watchlist with detailed information"""
     try:
+        # Storage already returns exactly the WatchlistResponse fields
         watchlist = storage.get_user_watchlist_detailed(user_id)
-        return watchlist
+        return ORJSONResponse(watchlist)
     except Exception as e:
         logger.error(f"Error getting detailed watchlist for user {user_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -118,7 +123,7 @@ async def add_to_watchlist(item: WatchlistItemRequest, user_id: str = "demo_user
                     "error": "Failed to add to scheduler"
                 }
             
-            logger.info(f"Created and scheduled analysis task for {item.ticker}: {task_data['task_id']}")
+            logger.info("Created and scheduled analysis task for %s: %s", item.ticker, task_data['task_id'])
             
         except Exception as analysis_exception:
             # Log the error but don't fail the watchlist addition
@@ -164,8 +169,7 @@ async def remove_from_watchlist(ticker: str, user_id: str = "demo_user"):
         
         try:
             # Get all scheduled tasks for this user and ticker
-            all_tasks = analysis_service.list_scheduled_tasks(user_id=user_id, limit=1000)
-            related_tasks = [task for task in all_tasks if task.get("ticker", "").upper() == ticker.upper()]
+            related_tasks = analysis_service.list_scheduled_tasks(user_id=user_id, limit=1000, ticker=ticker)
             
             for task in related_tasks:
                 task_id = task.get("task_id")
@@ -181,7 +185,7 @@ async def remove_from_watchlist(ticker: str, user_id: str = "demo_user"):
                                 "task_id": task_id,
                                 "status": "deleted"
                             })
-                            logger.info(f"Deleted analysis task {task_id} for {ticker}")
+                            logger.info("Deleted analysis task %s for %s", task_id, ticker)
                         else:
                             task_deletion_errors.append({
                                 "task_id": task_id,
@@ -9,6 +9,7 @@ import os
 import uuid
 import asyncio
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 
@@ -18,6 +19,37 @@ from backend.database.storage_service import DatabaseStorage
 
 logger = logging.getLogger(__name__)
 
+# Primary Accept-Language tags mapped to supported language codes
+_LANGUAGE_MAP = {
+    "zh-CN": "zh-CN",
+    "zh-TW": "zh-TW", 
+    "zh": "zh-CN",
+    "en-US": "en-US",
+    "en-GB": "en-US",
+    "en": "en-US",
+    "ja": "ja-JP",
+    "ja-JP": "ja-JP",
+    "ko": "ko-KR",
+    "ko-KR": "ko-KR",
+    "fr": "fr-FR",
+    "fr-FR": "fr-FR",
+    "de": "de-DE",
+    "de-DE": "de-DE",
+    "es": "es-ES",
+    "es-ES": "es-ES",
+}
+
+
+@lru_cache(maxsize=128)
+def normalize_language(accept_language: str) -> str:
+    """Normalize Accept-Language header to supported language codes."""
+    # Extract primary language from Accept-Language header (e.g., "zh-CN,zh;q=0.9,en;q=0.8" -> "zh-CN")
+    if not accept_language:
+        return "en-US"
+    
+    primary_lang = accept_language.split(',')[0].strip()
+    return _LANGUAGE_MAP.get(primary_lang, "en-US")
+
 
 class AnalysisRunnerService:
     """
@@ -89,8 +121,8 @@ class AnalysisRunnerService:
             "quick_think_llm": user_config["quick_think_llm"],
             "online_tools": True,
             "project_dir": str(Path.cwd()),
-            "report_language": self._normalize_language(report_language),
-            "default_language": self._normalize_language(report_language)
+            "report_language": normalize_language(report_language),
+            "default_language": normalize_language(report_language)
         }
         
         # Add API key based on LLM provider
@@ -103,36 +135,6 @@ class AnalysisRunnerService:
         
         return config, user_config
     
-    def _normalize_language(self, accept_language: str) -> str:
-        """Normalize Accept-Language header to supported language codes."""
-        # Extract primary language from Accept-Language header (e.g., "zh-CN,zh;q=0.9,en;q=0.8" -> "zh-CN")
-        if not accept_language:
-            return "en-US"
-        
-        primary_lang = accept_language.split(',')[0].strip()
-        
-        # Map common language codes to supported ones
-        language_map = {
-            "zh-CN": "zh-CN",
-            "zh-TW": "zh-TW", 
-            "zh": "zh-CN",
-            "en-US": "en-US",
-            "en-GB": "en-US",
-            "en": "en-US",
-            "ja": "ja-JP",
-            "ja-JP": "ja-JP",
-            "ko": "ko-KR",
-            "ko-KR": "ko-KR",
-            "fr": "fr-FR",
-            "fr-FR": "fr-FR",
-            "de": "de-DE",
-            "de-DE": "de-DE",
-            "es": "es-ES",
-            "es-ES": "es-ES",
-        }
-        
-        return language_map.get(primary_lang, "en-US")
-    
  
     def extract_reports_from_state(self, final_state: Dict[str, Any]) -> Dict[str, str]:
         """Extract reports from final state."""
@@ -222,26 +224,31 @@ class AnalysisRunnerService:
         # Generate analysis_id for further operations
         analysis_id = str(uuid.uuid4())
         
-        # Save unified report with all sections
-        # Filter out empty reports
-        non_empty_reports = {report_type: content for report_type, content in reports.items() if content}
-        if non_empty_reports:
-            self.storage.save_unified_report(
-                analysis_id=analysis_id,
-                user_id=user_id,
-                ticker=ticker,
-                sections=non_empty_reports,
-                title=f"{ticker.upper()} Complete Analysis Report"
-            )
-        
         # Create and store task results
         task_result = self.create_task_result(analysis_id, reports, processed_signal)
         print(task_result)
-        # Update task with results and mark as completed
-        self.storage.update_scheduled_task_status(task_id, "completed", 
-                                      analysis_id=analysis_id,
-                                      result_data=task_result,
-                                      progress=100)
+        
+        # Save the report and complete the task in one transaction
+        with self.storage.transaction() as db:
+            # Save unified report with all sections
+            # Filter out empty reports
+            non_empty_reports = {report_type: content for report_type, content in reports.items() if content}
+            if non_empty_reports:
+                self.storage.save_unified_report(
+                    analysis_id=analysis_id,
+                    user_id=user_id,
+                    ticker=ticker,
+                    sections=non_empty_reports,
+                    title=f"{ticker.upper()} Complete Analysis Report",
+                    db=db
+                )
+            
+            # Update task with results and mark as completed
+            self.storage.update_scheduled_task_status(task_id, "completed", 
+                                          db=db,
+                                          analysis_id=analysis_id,
+                                          result_data=task_result,
+                                          progress=100)
         
         # Log system event for successful completion
         self.storage.log_system_event("analysis_completed", {
@@ -1,19 +1,28 @@
 import logging
 import uuid
+from copy import deepcopy
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
+from sqlalchemy.orm import Session
+
 from tradingagents.default_config import DEFAULT_CONFIG
+from backend.database.cache import make_cache
+from backend.database.models import SCHEDULED_TASK_TYPES
 from backend.database.storage_service import DatabaseStorage
 
 logger = logging.getLogger(__name__)
 
+_VALID_SCHEDULE_TYPES = frozenset(("immediate",) + SCHEDULED_TASK_TYPES)
+
 
 class AnalysisService:
     """Service class for handling trading analysis operations"""
     
     def __init__(self):
         self.storage = DatabaseStorage()
+        # /analysis/config is read on every UI refresh; invalidated when preferences change
+        self._config_cache = make_cache("analysis_config", maxsize=8, ttl=60)
     
     def get_user_config_with_defaults(self, user_id: str) -> Dict[str, Any]:
         """Get user configuration with fallback to system defaults."""
@@ -31,9 +40,13 @@ class AnalysisService:
     
     def get_analysis_config(self, user_id: str = "demo_user") -> Dict[str, Any]:
         """Get analysis configuration for creating new tasks."""
+        cached = self._config_cache.get(user_id)
+        if cached is not None:
+            return deepcopy(cached)
+        
         user_config = self.get_user_config_with_defaults(user_id)
         
-        return {
+        config = {
             "default_config": {
                 "llm_provider": user_config["llm_provider"],
                 "backend_url": user_config["backend_url"],
@@ -43,15 +56,23 @@ class AnalysisService:
                 "analysts": user_config["default_analysts"]
             }
         }
+        self._config_cache.set(user_id, config)
+        return deepcopy(config)
+    
+    def invalidate_config(self, user_id: str = "demo_user") -> None:
+        """Drop the cached analysis configuration after the user's preferences change."""
+        self._config_cache.delete(user_id)
     
-    def get_analysis_history(self, user_id: str = "demo_user", ticker: str = None, limit: int = 50) -> Dict[str, Any]:
-        """Get analysis history for a user."""
-        analyses = self.storage.list_analysis(user_id, ticker, limit)
+    def get_analysis_history(self, user_id: str = "demo_user", ticker: str = None, limit: int = 50,
+                             include_state: bool = True) -> Dict[str, Any]:
+        """Get analysis history for a user; include_state=False omits each analysis' final_state."""
+        analyses = self.storage.list_analysis(user_id, ticker, limit, include_state)
         return {"analyses": analyses}
     
-    def get_analysis_by_id(self, analysis_id: str, user_id: str = "demo_user") -> Optional[Dict[str, Any]]:
-        """Get specific analysis by ID."""
-        return self.storage.get_analysis(user_id, analysis_id)
+    def get_analysis_by_id(self, analysis_id: str, user_id: str = "demo_user",
+                           include_state: bool = True) -> Optional[Dict[str, Any]]:
+        """Get specific analysis by ID; include_state=False omits final_state."""
+        return self.storage.get_analysis(user_id, analysis_id, include_state)
     
     def create_scheduled_task(self, 
                               ticker: str,
@@ -64,7 +85,9 @@ class AnalysisService:
                               cron_expression: Optional[str] = None,
                               enabled: bool = True,
                               user_id: str = "demo_user",
-                              language: str = "en-US") -> Dict[str, Any]:
+                              language: str = "en-US",
+                              initial_status: str = "created",
+                              db: Optional[Session] = None) -> Dict[str, Any]:
         """
         Create scheduled task.
         This method creates and stores the task data in the unified ScheduledTask model.
@@ -80,6 +103,8 @@ class AnalysisService:
             cron_expression: Cron expression for 'cron' type
             enabled: Whether task is enabled
             user_id: User identifier
+            initial_status: Status stored with the new row
+            db: Optional session from storage.transaction(); the caller commits
             
         Returns:
             dict: Created task data with unique ID
@@ -108,16 +133,16 @@ class AnalysisService:
             "cron_expression": cron_expression,
             "timezone": timezone,
             "enabled": enabled,
-            "status": "created",
+            "status": initial_status,
             "language": language
         }
         
         # Create task using unified API
         try:
-            task_id = self.storage.create_scheduled_task(task_data)
+            task_id = self.storage.create_scheduled_task(task_data, db=db)
             
             # Get the created task data
-            created_task = self.storage.get_scheduled_task(task_id)
+            created_task = self.storage.get_scheduled_task(task_id, db=db)
             if not created_task:
                 raise Exception(f"Failed to retrieve created task {task_id}")
             
@@ -128,9 +153,9 @@ class AnalysisService:
                 "analysts": analysts,
                 "schedule_type": schedule_type,
                 "user_id": user_id
-            })
+            }, db=db)
             
-            logger.info(f"Created scheduled task {task_id} for {ticker}")
+            logger.info("Created scheduled task %s for %s", task_id, ticker)
             return created_task
             
         except Exception as e:
@@ -143,7 +168,7 @@ class AnalysisService:
                                     schedule_date: Optional[str] = None,
                                     cron_expression: Optional[str] = None) -> None:
         """Validate schedule parameters."""
-        if schedule_type not in ["immediate", "once", "daily", "weekly", "monthly", "cron"]:
+        if schedule_type not in _VALID_SCHEDULE_TYPES:
             raise ValueError("Invalid schedule_type. Must be one of: immediate, once, daily, weekly, monthly, cron")
         
         # Validate time format (skip for immediate tasks)
@@ -171,11 +196,11 @@ class AnalysisService:
         if schedule_type == "cron" and not cron_expression:
             raise ValueError("cron_expression is required for 'cron' schedule type")
     
-    def update_scheduled_task_status(self, task_id: str, status: str, **kwargs) -> None:
+    def update_scheduled_task_status(self, task_id: str, status: str, db: Optional[Session] = None, **kwargs) -> None:
         """Update scheduled task status and additional data."""
         try:
-            self.storage.update_scheduled_task_status(task_id, status, **kwargs)
-            logger.info(f"Updated scheduled task {task_id} status to {status}")
+            self.storage.update_scheduled_task_status(task_id, status, db=db, **kwargs)
+            logger.info("Updated scheduled task %s status to %s", task_id, status)
         except Exception as e:
             logger.error(f"Error updating scheduled task status: {e}")
             raise e
@@ -188,10 +213,11 @@ class AnalysisService:
             logger.error(f"Error getting scheduled task: {e}")
             return None
     
-    def list_scheduled_tasks(self, user_id: str = "demo_user", status: str = None, schedule_type: str = None, limit: int = 50) -> List[Dict[str, Any]]:
+    def list_scheduled_tasks(self, user_id: str = "demo_user", status: str = None, schedule_type: str = None, limit: int = 50,
+                             ticker: str = None) -> List[Dict[str, Any]]:
         """List scheduled tasks with optional filters."""
         try:
-            return self.storage.list_scheduled_tasks(user_id, status, schedule_type, limit)
+            return self.storage.list_scheduled_tasks(user_id, status, schedule_type, limit, ticker=ticker)
         except Exception as e:
             logger.error(f"Error listing scheduled tasks: {e}")
             return []
@@ -204,7 +230,7 @@ class AnalysisService:
                 self.storage.log_system_event("scheduled_task_deleted", {
                     "task_id": task_id
                 })
-                logger.info(f"Deleted scheduled task {task_id}")
+                logger.info("Deleted scheduled task %s", task_id)
             return success
         except Exception as e:
             logger.error(f"Error deleting scheduled task: {e}")
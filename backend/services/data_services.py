@@ -42,7 +42,7 @@ class DataServices:
         # 初始化PolygonUtils
         try:
             self.polygon_utils = PolygonUtils(require_api_key=require_api_key)
-            logger.info(f"PolygonUtils初始化成功，require_api_key={require_api_key}")
+            logger.info("PolygonUtils初始化成功，require_api_key=%s", require_api_key)
         except Exception as e:
             logger.warning(f"初始化PolygonUtils失败: {e}")
             self.polygon_utils = None
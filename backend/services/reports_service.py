@@ -5,7 +5,7 @@ updating, and deletion of trading analysis reports.
 """
 
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, List, Optional, Union
 from pathlib import Path
 
@@ -71,7 +71,7 @@ class ReportsService:
                 "title": title
             })
             
-            logger.info(f"Created unified report {report_id} for analysis {analysis_id}")
+            logger.info("Created unified report %s for analysis %s", report_id, analysis_id)
             return report_id
             
         except Exception as e:
@@ -99,17 +99,18 @@ class ReportsService:
                 logger.warning(f"Report {report_id} not found for user {user_id}")
                 return None
             
-            # Enhanced report data with computed fields
-            enhanced_report = {
-                **report,
+            # Enhanced report data with computed fields; full ReportRows always carry sections.
+            # get_report builds a fresh dict per call, so annotate it in place rather than copy it
+            sections = report["sections"]
+            report.update({
                 "report_type": "unified_analysis",  # All reports are now unified
-                "sections_count": len(report.get("sections", {})) if report.get("sections") else 0,
-                "has_investment_plan": "investment_plan" in report.get("sections", {}),
-                "has_market_report": "market_report" in report.get("sections", {}),
-                "has_trade_decision": "final_trade_decision" in report.get("sections", {})
-            }
+                "sections_count": len(sections),
+                "has_investment_plan": "investment_plan" in sections,
+                "has_market_report": "market_report" in sections,
+                "has_trade_decision": "final_trade_decision" in sections
+            })
             
-            return enhanced_report
+            return report
             
         except Exception as e:
             logger.error(f"Error getting report {report_id}: {e}")
@@ -120,7 +121,8 @@ class ReportsService:
                     ticker: str = None, 
                     analysis_id: str = None,
                     watchlist_only: bool = False,
-                    limit: int = 100) -> List[Dict[str, Any]]:
+                    limit: int = 100,
+                    include_sections: bool = True) -> List[Dict[str, Any]]:
         """
         Get list of reports with optional filters.
         
@@ -130,6 +132,7 @@ class ReportsService:
             analysis_id: Optional analysis ID filter
             watchlist_only: Filter by user's watchlist (currently all reports are considered in watchlist)
             limit: Maximum number of reports to return
+            include_sections: Load report sections and section-derived fields (skip for lightweight listings)
             
         Returns:
             list: List of report summaries
@@ -140,12 +143,14 @@ class ReportsService:
                 user_id=user_id,
                 ticker=ticker,
                 analysis_id=analysis_id,
-                limit=limit
+                limit=limit,
+                include_sections=include_sections
             )
             
             # Enhance report data with additional fields
             enhanced_reports = []
-            user_watchlist = self.storage.get_user_watchlist(user_id) if watchlist_only else None
+            # One watchlist lookup for the whole page instead of one per report
+            user_watchlist = set(self.storage.get_user_watchlist(user_id))
             
             for report in reports:
                 # Check if ticker is in watchlist (if filtering)
@@ -159,24 +164,27 @@ class ReportsService:
                     "date": report["created_at"],
                     "report_type": "unified_analysis",  # All reports are unified
                     "title": report["title"],
-                    "sections": report.get("sections", {}),
-                    "sections_count": len(report.get("sections", {})) if report.get("sections") else 0,
                     "status": report["status"],
                     "created_at": report["created_at"],
                     "updated_at": report["updated_at"],
-                    "in_watchlist": self.storage.is_symbol_in_watchlist(user_id, report["ticker"]),
-                    # Additional computed fields
-                    "has_investment_plan": "investment_plan" in report.get("sections", {}),
-                    "has_market_report": "market_report" in report.get("sections", {}),
-                    "has_trade_decision": "final_trade_decision" in report.get("sections", {})
+                    "in_watchlist": report["ticker"] in user_watchlist
                 }
                 
+                if include_sections:
+                    sections = report["sections"]
+                    enhanced_report.update({
+                        "sections": sections,
+                        "sections_count": len(sections),
+                        # Additional computed fields
+                        "has_investment_plan": "investment_plan" in sections,
+                        "has_market_report": "market_report" in sections,
+                        "has_trade_decision": "final_trade_decision" in sections
+                    })
+                
                 enhanced_reports.append(enhanced_report)
             
-            # Sort by creation date (newest first)
-            enhanced_reports.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-            
-            logger.info(f"Retrieved {len(enhanced_reports)} reports for user {user_id}")
+            # Storage already returns newest first (ORDER BY created_at DESC on the user index)
+            logger.info("Retrieved %s reports for user %s", len(enhanced_reports), user_id)
             return enhanced_reports
             
         except Exception as e:
@@ -211,6 +219,7 @@ class ReportsService:
             
             # Enhance report data
             enhanced_reports = []
+            user_watchlist = set(self.storage.get_user_watchlist(user_id))
             for report in reports:
                 enhanced_report = {
                     "report_id": report["report_id"],
@@ -220,15 +229,15 @@ class ReportsService:
                     "report_type": "unified_analysis",
                     "title": report["title"],
                     "sections": report["sections"],
-                    "sections_count": len(report.get("sections", {})) if report.get("sections") else 0,
+                    "sections_count": len(report["sections"]),
                     "status": report["status"],
                     "created_at": report["created_at"],
                     "updated_at": report["updated_at"],
-                    "in_watchlist": self.storage.is_symbol_in_watchlist(user_id, report["ticker"])
+                    "in_watchlist": report["ticker"] in user_watchlist
                 }
                 enhanced_reports.append(enhanced_report)
             
-            logger.info(f"Retrieved {len(enhanced_reports)} reports for ticker {ticker}")
+            logger.info("Retrieved %s reports for ticker %s", len(enhanced_reports), ticker)
             return enhanced_reports
             
         except Exception as e:
@@ -277,7 +286,7 @@ class ReportsService:
                 "title": report.get("title")
             })
             
-            logger.info(f"Deleted report {report_id} for user {user_id}")
+            logger.info("Deleted report %s for user %s", report_id, user_id)
             
             return {
                 "success": True,
@@ -313,30 +322,32 @@ class ReportsService:
             if not report_ids:
                 raise ValueError("report_ids list is required")
             
-            results = []
-            successful_deletions = 0
+            # One SELECT + DELETE ... WHERE report_id IN (...) for the whole batch
+            report_ids = list(dict.fromkeys(report_ids))
+            deleted = {report["report_id"]: report for report in self.storage.delete_reports(user_id, report_ids)}
             
+            results = []
             for report_id in report_ids:
-                try:
-                    result = self.delete_report(report_id, user_id)
-                    results.append({
-                        "report_id": report_id,
-                        "success": result["success"],
-                        "message": result.get("message"),
-                        "error": result.get("error")
-                    })
-                    
-                    if result["success"]:
-                        successful_deletions += 1
-                        
-                except Exception as e:
+                report = deleted.get(report_id)
+                if report is None:
                     results.append({
                         "report_id": report_id,
                         "success": False,
-                        "error": str(e)
+                        "message": None,
+                        "error": "Report not found"
                     })
+                    continue
+                
+                self.storage.log_system_event("report_deleted", {"user_id": user_id, **report})
+                results.append({
+                    "report_id": report_id,
+                    "success": True,
+                    "message": f"Report {report_id} has been deleted",
+                    "error": None
+                })
+            successful_deletions = len(deleted)
             
-            logger.info(f"Batch deleted {successful_deletions}/{len(report_ids)} reports for user {user_id}")
+            logger.info("Batch deleted %s/%s reports for user %s", successful_deletions, len(report_ids), user_id)
             
             return {
                 "success": True,
@@ -395,7 +406,7 @@ class ReportsService:
                     reports_by_month[month_key] = reports_by_month.get(month_key, 0) + 1
                 
                 # Count sections
-                sections = report.get("sections", {})
+                sections = report["sections"]
                 if "investment_plan" in sections:
                     section_counts["with_investment_plan"] += 1
                 if "market_report" in sections:
@@ -420,7 +431,7 @@ class ReportsService:
                 "generated_at": datetime.now().isoformat()
             }
             
-            logger.info(f"Generated report statistics for user {user_id}: {total_reports} reports, {len(tickers)} tickers")
+            logger.info("Generated report statistics for user %s: %s reports, %s tickers", user_id, total_reports, len(tickers))
             return statistics
             
         except Exception as e:
@@ -444,27 +455,18 @@ class ReportsService:
             list: Recent reports
         """
         try:
-            # Get all reports and filter by date
-            all_reports = self.storage.list_reports(user_id=user_id, limit=limit * 2)  # Get more to filter
-            
-            # Calculate cutoff date
-            cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
-            
-            # Filter recent reports
-            recent_reports = [
-                report for report in all_reports
-                if report.get("created_at", "") >= cutoff_date
-            ]
-            
-            # Limit results
-            recent_reports = recent_reports[:limit]
+            # Date window and limit are applied in the query
+            # UTC, like the server-default created_at it is compared against
+            cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
+            recent_reports = self.storage.list_reports(user_id=user_id, limit=limit, created_after=cutoff_date)
             
             # Enhance with additional fields
+            user_watchlist = set(self.storage.get_user_watchlist(user_id)) if recent_reports else set()
             for report in recent_reports:
-                report["in_watchlist"] = self.storage.is_symbol_in_watchlist(user_id, report["ticker"])
-                report["sections_count"] = len(report.get("sections", {}))
+                report["in_watchlist"] = report["ticker"] in user_watchlist
+                report["sections_count"] = len(report["sections"])
             
-            logger.info(f"Retrieved {len(recent_reports)} recent reports for user {user_id} (last {days} days)")
+            logger.info("Retrieved %s recent reports for user %s (last %s days)", len(recent_reports), user_id, days)
             return recent_reports
             
         except Exception as e:
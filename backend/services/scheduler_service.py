@@ -5,13 +5,15 @@ Scheduler Service - Manages background task scheduling using APScheduler
 import logging
 import uuid
 import asyncio
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional, Callable
 from pathlib import Path
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.jobstores.base import JobLookupError
+from sqlalchemy.orm import Session
 
+from backend.database.models import SCHEDULED_TASK_TYPES
 from backend.database.storage_service import DatabaseStorage
 from backend.services.analysis_runner_service import AnalysisRunnerService
 
@@ -35,9 +37,11 @@ class SchedulerService:
     def start(self) -> None:
         """Start the scheduler service."""
         if not self._started:
+            # Jobs added before start() are queued and committed to the job store in one
+            # pass when the scheduler starts, instead of one locked add and wakeup per task
+            self.load_scheduled_tasks_on_startup()
             self.scheduler.start()
             self._started = True
-            self.load_scheduled_tasks_on_startup()
             logger.info("Scheduler service started")
     
     def stop(self) -> None:
@@ -54,14 +58,11 @@ class SchedulerService:
     def load_scheduled_tasks_on_startup(self) -> None:
         """Load scheduled tasks from persistent storage and register with scheduler."""
         try:
-            # Load from storage using unified API
-            loaded_tasks = self.storage.list_scheduled_tasks(limit=1000)
+            # Load from storage using unified API; only non-immediate tasks are scheduled
+            loaded_tasks = self.storage.list_scheduled_tasks(limit=1000, schedule_types=SCHEDULED_TASK_TYPES)
             
             # Convert to dict format for compatibility
-            task_dict = {}
-            for task in loaded_tasks:
-                if task["schedule_type"] != "immediate":  # Only schedule non-immediate tasks
-                    task_dict[task["task_id"]] = task
+            task_dict = {task["task_id"]: task for task in loaded_tasks}
             
             self.scheduled_tasks.update(task_dict)
             
@@ -70,7 +71,7 @@ class SchedulerService:
                 if task_info.get("enabled", True):
                     self._register_task_with_scheduler(task_id, task_info)
             
-            logger.info(f"Loaded and registered {len(task_dict)} scheduled tasks")
+            logger.info("Loaded and registered %s scheduled tasks", len(task_dict))
             
         except Exception as e:
             logger.error(f"Error loading scheduled tasks on startup: {e}")
@@ -178,7 +179,7 @@ class SchedulerService:
             if task_data["enabled"]:
                 self._add_job_to_scheduler(schedule_id, task_data, hour, minute)
             
-            logger.info(f"Added scheduled task {schedule_id} to scheduler for {task_data['ticker']}")
+            logger.info("Added scheduled task %s to scheduler for %s", schedule_id, task_data['ticker'])
             return True
             
         except Exception as e:
@@ -270,32 +271,40 @@ class SchedulerService:
             if not success:
                 raise Exception("Failed to delete task from storage")
             
-            logger.info(f"Deleted scheduled task {task_id}")
+            logger.info("Deleted scheduled task %s", task_id)
             return True
             
         except Exception as e:
             logger.error(f"Error deleting scheduled task {task_id}: {e}")
             raise e
     
-    def update_scheduled_task(self, task_id: str, update_data: Dict[str, Any]) -> Dict[str, Any]:
+    def update_scheduled_task(self, task_id: str, update_data: Dict[str, Any],
+                              db: Optional[Session] = None) -> Dict[str, Any]:
         """
         Update a scheduled task configuration.
         
         Args:
             task_id: ID of task to update
             update_data: Dictionary containing updated task configuration
+            db: Optional session from storage.transaction(); the caller commits
             
         Returns:
             dict: Updated task information
             
         Raises:
-            ValueError: If task not found or invalid data
+            ValueError: If no scheduled (non-immediate) task with this ID exists
         """
-        if task_id not in self.scheduled_tasks:
+        # The database is authoritative: one conditional UPDATE both checks and writes the task,
+        # whether or not this worker has it in memory
+        if not self.storage.update_scheduled_task(task_id, update_data, db=db, exclude_immediate=True):
             raise ValueError("Scheduled task not found")
         
         try:
-            task_info = self.scheduled_tasks[task_id]
+            task_info = self.scheduled_tasks.get(task_id)
+            if task_info is None:
+                # Registered by another worker; adopt the stored row (db sees the uncommitted update)
+                task_info = self.storage.get_scheduled_task(task_id, db=db)
+                self.scheduled_tasks[task_id] = task_info
             
             # Remove from scheduler if it exists
             try:
@@ -310,10 +319,7 @@ class SchedulerService:
             if task_info.get("enabled", True):
                 self._register_task_with_scheduler(task_id, task_info)
             
-            # Save to persistent storage
-            self.storage.update_scheduled_task(task_id, update_data)
-            
-            logger.info(f"Updated scheduled task {task_id}")
+            logger.info("Updated scheduled task %s", task_id)
             return {"message": "Task updated successfully", "task": task_info}
             
         except Exception as e:
@@ -380,17 +386,15 @@ class SchedulerService:
     def refresh_scheduled_tasks(self) -> bool:
         """Refresh scheduled tasks from storage to sync with persistent data."""
         try:
-            loaded_tasks = self.storage.list_scheduled_tasks(limit=1000)
+            # Only include scheduled tasks
+            loaded_tasks = self.storage.list_scheduled_tasks(limit=1000, schedule_types=SCHEDULED_TASK_TYPES)
             
             # Convert to dict format for compatibility
-            task_dict = {}
-            for task in loaded_tasks:
-                if task["schedule_type"] != "immediate":  # Only include scheduled tasks
-                    task_dict[task["task_id"]] = task
+            task_dict = {task["task_id"]: task for task in loaded_tasks}
             
             self.scheduled_tasks.clear()
             self.scheduled_tasks.update(task_dict)
-            logger.debug(f"Refreshed {len(task_dict)} scheduled tasks from storage")
+            logger.debug("Refreshed %s scheduled tasks from storage", len(task_dict))
             return True
         except Exception as e:
             logger.error(f"Error refreshing scheduled tasks: {e}")
@@ -439,7 +443,7 @@ class SchedulerService:
                 schedule_id=schedule_id
             ))
             
-            logger.info(f"Triggered scheduled analysis {execution_id} for schedule {schedule_id}")
+            logger.info("Triggered scheduled analysis %s for schedule %s", execution_id, schedule_id)
                 
         except Exception as e:
             logger.error(f"Error starting scheduled analysis {schedule_id}: {e}")
@@ -450,7 +454,7 @@ class SchedulerService:
                                          research_depth: int, schedule_id: str) -> None:
         """统一的背景任务执行器，处理所有类型的分析任务."""
         try:
-            logger.info(f"Starting analysis execution {execution_id} for schedule {schedule_id}")
+            logger.info("Starting analysis execution %s for schedule %s", execution_id, schedule_id)
             
             # 在线程池中执行同步分析，避免阻塞事件循环
             result = await asyncio.to_thread(
@@ -465,12 +469,14 @@ class SchedulerService:
             
             # 更新调度任务的执行状态
             if schedule_id:  # 只有调度任务才更新schedule状态
+                # 直接读取内存中的任务，无需复制整个任务字典
+                task_info = self.scheduled_tasks.get(schedule_id, {})
                 self.update_task_execution(schedule_id, {
-                    "last_run": datetime.now().isoformat(),
-                    "execution_count": self.get_scheduled_task(schedule_id).get("execution_count", 0) + 1
+                    "last_run": datetime.now(timezone.utc).isoformat(),
+                    "execution_count": task_info.get("execution_count", 0) + 1
                 })
             
-            logger.info(f"Completed analysis execution {execution_id}")
+            logger.info("Completed analysis execution %s", execution_id)
             return result
                 
         except Exception as e:
@@ -483,7 +489,7 @@ class SchedulerService:
             if schedule_id:
                 self.update_task_execution(schedule_id, {
                     "last_error": str(e),
-                    "last_run": datetime.now().isoformat()
+                    "last_run": datetime.now(timezone.utc).isoformat()
                 })
             
             # 记录系统事件
@@ -526,7 +532,7 @@ class SchedulerService:
             schedule_id=schedule_id
         ))
         
-        logger.info(f"Started analysis task {execution_id} for {ticker}")
+        logger.info("Started analysis task %s for %s", execution_id, ticker)
         return execution_id
     
     def _get_execution_function(self) -> Callable:
@@ -4,6 +4,7 @@ Maintains compatibility with the original LocalStorage API.
 """
 
 import logging
+from functools import lru_cache
 from backend.database.storage_service import DatabaseStorage
 from backend.database.database import init_database
 
@@ -53,14 +54,17 @@ class LocalStorage:
     def list_users(self):
         return self._storage.list_users()
     
+    def iter_users(self, batch_size: int = 1000):
+        return self._storage.iter_users(batch_size)
+    
     def save_analysis(self, user_id: str, ticker: str, analysis_data: dict) -> str:
         return self._storage.save_analysis(user_id, ticker, analysis_data)
     
-    def get_analysis(self, user_id: str, analysis_id: str):
-        return self._storage.get_analysis(user_id, analysis_id)
+    def get_analysis(self, user_id: str, analysis_id: str, include_state: bool = True):
+        return self._storage.get_analysis(user_id, analysis_id, include_state)
     
-    def list_analysis(self, user_id: str, ticker: str = None, limit: int = 50):
-        return self._storage.list_analysis(user_id, ticker, limit)
+    def list_analysis(self, user_id: str, ticker: str = None, limit: int = 50, include_state: bool = True):
+        return self._storage.list_analysis(user_id, ticker, limit, include_state)
     
     def delete_analysis(self, user_id: str, analysis_id: str) -> bool:
         return self._storage.delete_analysis(user_id, analysis_id)
@@ -89,21 +93,48 @@ class LocalStorage:
     def save_notification(self, user_id: str, notification: dict) -> str:
         return self._storage.save_notification(user_id, notification)
     
+    def create_notification(self, user_id: str, notification: dict) -> dict:
+        return self._storage.create_notification(user_id, notification)
+    
+    def save_notifications(self, user_id: str, notifications: list) -> list:
+        return self._storage.save_notifications(user_id, notifications)
+    
     def get_notifications(self, user_id: str, unread_only: bool = False, limit: int = 50):
         return self._storage.get_notifications(user_id, unread_only, limit)
     
+    def get_notification_counts(self, user_id: str) -> dict:
+        return self._storage.get_notification_counts(user_id)
+    
     def mark_notification_read(self, user_id: str, notification_id: str) -> bool:
         return self._storage.mark_notification_read(user_id, notification_id)
     
-    def log_system_event(self, event_type: str, event_data: dict):
-        return self._storage.log_system_event(event_type, event_data)
+    def mark_all_notifications_read(self, user_id: str) -> int:
+        return self._storage.mark_all_notifications_read(user_id)
+    
+    def delete_old_notifications(self, days: int = 30) -> int:
+        return self._storage.delete_old_notifications(days)
+    
+    def log_system_event(self, event_type: str, event_data: dict, sync: bool = False):
+        return self._storage.log_system_event(event_type, event_data, sync)
     
     def get_system_logs(self, date_str: str = None, event_type: str = None):
         return self._storage.get_system_logs(date_str, event_type)
     
+    def get_event_types(self) -> list:
+        return self._storage.get_event_types()
+    
+    def get_event_statistics(self, days: int = 7) -> dict:
+        return self._storage.get_event_statistics(days)
+    
+    def cleanup_old_logs(self, days: int = 30) -> int:
+        return self._storage.cleanup_old_logs(days)
+    
     def get_user_watchlist(self, user_id: str):
         return self._storage.get_user_watchlist(user_id)
     
+    def get_watchlist_count(self, user_id: str) -> int:
+        return self._storage.get_watchlist_count(user_id)
+    
     def add_to_watchlist(self, user_id: str, symbol: str) -> bool:
         return self._storage.add_to_watchlist(user_id, symbol)
     
@@ -116,6 +147,12 @@ class LocalStorage:
     def is_symbol_in_watchlist(self, user_id: str, symbol: str) -> bool:
         return self._storage.is_symbol_in_watchlist(user_id, symbol)
     
+    def get_symbols_with_alerts(self, user_id: str = None):
+        return self._storage.get_symbols_with_alerts(user_id)
+    
+    def transaction(self):
+        return self._storage.transaction()
+    
     # Scheduled Task Management - Unified API
     def create_scheduled_task(self, task_data: dict) -> str:
         return self._storage.create_scheduled_task(task_data)
@@ -123,8 +160,15 @@ class LocalStorage:
     def get_scheduled_task(self, task_id: str):
         return self._storage.get_scheduled_task(task_id)
     
-    def list_scheduled_tasks(self, user_id: str = None, status: str = None, schedule_type: str = None, limit: int = 50):
-        return self._storage.list_scheduled_tasks(user_id, status, schedule_type, limit)
+    def get_scheduled_task_fields(self, task_id: str, fields) -> dict:
+        return self._storage.get_scheduled_task_fields(task_id, fields)
+    
+    def list_scheduled_tasks(self, user_id: str = None, status: str = None, schedule_type: str = None, limit: int = 50,
+                             schedule_types=None, ticker: str = None):
+        return self._storage.list_scheduled_tasks(user_id, status, schedule_type, limit, schedule_types, ticker)
+    
+    def count_scheduled_tasks(self, user_id: str = None, status: str = None, schedule_type: str = None) -> int:
+        return self._storage.count_scheduled_tasks(user_id, status, schedule_type)
     
     def update_scheduled_task(self, task_id: str, updates: dict) -> bool:
         return self._storage.update_scheduled_task(task_id, updates)
@@ -140,3 +184,9 @@ class LocalStorage:
     
     def create_backup(self, backup_name: str = None) -> str:
         return self._storage.create_backup(backup_name)
+
+
+@lru_cache(maxsize=None)
+def get_local_storage() -> LocalStorage:
+    """Process-wide LocalStorage; runs init_database once and shares the engine's connection pool."""
+    return LocalStorage()